@@ -0,0 +1,70 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = ("metadata.reader", "transcript.convert")
+HEAVY_DEPENDENCIES = ("arrow", "webvtt", "yaml", "sqlite3")
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter under -X importtime.
+
+    Returns the cumulative import time of the module in microseconds and any heavy
+    dependencies that were pulled in along the way.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, imported = line.split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        imported = imported.strip()
+        if imported.split(".")[0] in HEAVY_DEPENDENCIES:
+            loaded.add(imported.split(".")[0])
+        if imported == module:
+            cumulative = int(cumulative_us)
+    return cumulative, sorted(loaded)
+
+
+def benchmark(modules=MODULES, repeat=5):
+    results = []
+    for module in modules:
+        timings = []
+        for _ in range(repeat):
+            cumulative, loaded = measure_import(module)
+            timings.append(cumulative)
+        results.append(
+            {
+                "module": module,
+                "median_us": statistics.median(timings),
+                "min_us": min(timings),
+                "heavy_dependencies": loaded,
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Track python -X importtime for the metadata and transcript packages."
+    )
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    args = parser.parse_args()
+    results = benchmark(args.modules, args.repeat)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
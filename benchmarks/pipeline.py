@@ -0,0 +1,140 @@
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from metadata.index import IDENTIFIER
+from metadata.manifest import canvas_id
+from metadata.reader import Interview, MediaFragment, MetadataReader
+from .synthetic import CHAPTERS, QUESTIONS, synthetic_row, write_csv
+
+SIZES = (100, 10_000, 1_000_000)
+SLOTS = ((3, 0), (18, 3), (QUESTIONS, CHAPTERS))
+
+
+def time_metadata_reader(path):
+    """Stream every manifest out of a CSV on disk."""
+    started = time.perf_counter()
+    rows = sum(1 for _ in MetadataReader(path).iter_interviews())
+    return time.perf_counter() - started, rows
+
+
+def time_interview(rows):
+    """Build Interview objects from rows already held in memory."""
+    started = time.perf_counter()
+    for row in rows:
+        Interview(row)
+    return time.perf_counter() - started, len(rows)
+
+
+def time_build_range(fragments):
+    """Construct MediaFragments and build their ranges."""
+    started = time.perf_counter()
+    for label, canvas, start, end in fragments:
+        MediaFragment(label, canvas, start, end).build_range()
+    return time.perf_counter() - started, len(fragments)
+
+
+def run(sizes=SIZES, slots=SLOTS, sample=10_000, seed=0):
+    """Time each stage against synthetic CSVs of every size and slot count.
+
+    slots holds (questions, chapters) pairs: how many of each are filled in per row.
+    MetadataReader reads the whole file; Interview and MediaFragment are timed over at
+    most sample in-memory rows so the largest sizes stay practical. Each result records
+    both the CSV's csv_rows and the rows that stage actually timed.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for questions, chapters in slots:
+            for csv_rows in sizes:
+                path = write_csv(
+                    os.path.join(directory, f"metadata_{csv_rows}.csv"),
+                    csv_rows,
+                    questions,
+                    chapters,
+                    seed,
+                )
+                generator = random.Random(seed)
+                in_memory = [
+                    synthetic_row(generator, index, questions, chapters)
+                    for index in range(min(csv_rows, sample))
+                ]
+                fragments = [
+                    (
+                        row[f"Interview_Question_{number}"],
+                        canvas_id(row[IDENTIFIER]),
+                        row[f"Interview_Question_{number}_TC"],
+                        row.get(f"Interview_Question_{number + 1}_TC")
+                        or row["Interview Stop TC"],
+                    )
+                    for row in in_memory
+                    for number in range(1, questions + 1)
+                ]
+                metadata_reader = time_metadata_reader(path)
+                for stage, rows, (seconds, items) in (
+                    ("MetadataReader", metadata_reader[1], metadata_reader),
+                    ("Interview", len(in_memory), time_interview(in_memory)),
+                    (
+                        "MediaFragment.build_range",
+                        len(in_memory),
+                        time_build_range(fragments),
+                    ),
+                ):
+                    results.append(
+                        {
+                            "stage": stage,
+                            "csv_rows": csv_rows,
+                            "rows": rows,
+                            "questions": questions,
+                            "chapters": chapters,
+                            "items": items,
+                            "seconds": seconds,
+                            "items_per_second": items / seconds if seconds else None,
+                        }
+                    )
+                os.remove(path)
+    return results
+
+
+def record(results, output):
+    """Append results to a JSON Lines file so runs can be compared over time."""
+    recorded_at = datetime.now(timezone.utc).isoformat()
+    with open(output, "a") as results_file:
+        for result in results:
+            result = {
+                "recorded_at": recorded_at,
+                "python": platform.python_version(),
+                **result,
+            }
+            results_file.write(f"{json.dumps(result)}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the manifest pipeline against synthetic metadata exports."
+    )
+    parser.add_argument("--rows", nargs="+", type=int, default=SIZES)
+    parser.add_argument(
+        "--slots",
+        nargs="+",
+        type=lambda value: tuple(int(count) for count in value.split(",")),
+        default=SLOTS,
+        metavar="QUESTIONS,CHAPTERS",
+        help="filled question and chapter slots per row, e.g. --slots 18,3 72,10",
+    )
+    parser.add_argument("--sample", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks/results.jsonl")
+    args = parser.parse_args()
+    results = run(args.rows, args.slots, args.sample, args.seed)
+    record(results, args.output)
+    for result in results:
+        print(
+            f"{result['stage']:<28}{result['questions']:>3}q {result['chapters']:>3}c "
+            f"{result['csv_rows']:>10} csv rows {result['rows']:>10} rows "
+            f"{result['items']:>10} items {result['seconds']:>10.3f}s "
+            f"{result['items_per_second'] or 0:>12.0f}/s"
+        )
@@ -0,0 +1,139 @@
+import csv
+import random
+
+QUESTIONS = 72
+CHAPTERS = 10
+LOCATIONS = 6
+
+HEADER = (
+    [
+        "UT Intellectual Unit - YYYYMMDD_Lastname_Firstname",
+        "APPL Interview - Original Filename",
+        "Title",
+        "Interview Start TC",
+        "Interview Stop TC",
+        "License",
+        "Access Note",
+        "Narrator Name",
+        "Narrator Name 2",
+        "Narrator Name 3",
+        "Interviewer Name",
+        "Date Recorded",
+        "Location Recorded",
+        "Narrator Location Recorded",
+        "AAT Format ",
+        "Abstract",
+        "Narrator Class 1",
+        "Narrator Class 2",
+        "LCSH_Topic_1",
+        "LCSH_Topic_2",
+        "LCSH_Topic_3",
+        "LCSH_Geo_1",
+        "LCSH_Geo_2",
+        "LCSH_Name_1",
+        "LCSH_Name_2",
+    ]
+    + [
+        column
+        for number in range(1, QUESTIONS + 1)
+        for column in (
+            f"Interview_Question_{number}",
+            f"Interview_Question_{number}_TC",
+        )
+    ]
+    + [
+        column
+        for number in range(1, CHAPTERS + 1)
+        for column in (f"Chapter_{number}", f"Chapter_{number}_TC")
+    ]
+    + [f"Chapter_{CHAPTERS + 1}", "Quote from Interview"]
+    + [
+        column
+        for number in range(1, LOCATIONS + 1)
+        for column in (
+            f"Location_{number}\n" if number == 1 else f"Location_{number}",
+            f"Location_{number}_Coordinates",
+            f"Location_{number}_TC",
+        )
+    ]
+    + [
+        "Date of Birth",
+        "Birthplace",
+        "Length of Time in Gatlinburg/East Tennessee",
+        "Education",
+        "Occupational Experience",
+        "Other Community Involvement",
+        "Other Life Info",
+        "Disclaimer",
+        "Privacy/Defamation concern?",
+        "Appearance Release",
+    ]
+)
+
+SURNAMES = ("James", "Ogle", "Reagan", "Whaley", "Maples", "Huskey", "Clabo")
+GIVEN_NAMES = ("Zachary", "Laura", "Ken", "Mary", "John", "Ruth", "Paul")
+PLACES = (
+    "John C. Hodges Library, University of Tennessee, Knoxville",
+    "Park Vista Hotel, Gatlinburg, Tennessee",
+    "Anna Porter Public Library, Gatlinburg, Tennessee",
+)
+TOPICS = ("Wildfires", "Evacuation of civilians", "Social media", "Disaster relief")
+
+
+def timecode(seconds):
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def synthetic_row(generator, index, questions=18, chapters=3):
+    """Build one CSV row shaped like the real metadata export.
+
+    The first questions Interview_Question slots and chapters Chapter slots are filled
+    with increasing timecodes; every other slot is left blank, as in the real export.
+    """
+    surname = generator.choice(SURNAMES)
+    given_name = generator.choice(GIVEN_NAMES)
+    year = generator.randint(2017, 2020)
+    month = generator.randint(1, 12)
+    day = generator.randint(1, 28)
+    row = dict.fromkeys(HEADER, "")
+    stop = 60 * generator.randint(15, 180)
+    row.update(
+        {
+            "UT Intellectual Unit - YYYYMMDD_Lastname_Firstname": f"{year}{month:02d}{day:02d}_{surname}_{given_name}_{index}",
+            "Title": f"Interview with {given_name} {surname}, {year}-{month:02d}-{day:02d}",
+            "Interview Start TC": "0:00:20",
+            "Interview Stop TC": timecode(stop),
+            "License": "Creative Commons Attribution 4.0 International License \nhttps://creativecommons.org/licenses/by/4.0",
+            "Narrator Name": f"{surname}, {given_name}",
+            "Interviewer Name": "Romans, Laura",
+            "Date Recorded": f"{month}/{day}/{year}",
+            "Location Recorded": generator.choice(PLACES),
+            "Narrator Location Recorded": generator.choice(PLACES),
+            "AAT Format ": "motion pictures (visual works) http://vocab.getty.edu/aat/300136900",
+            "Abstract": f"Interview with {given_name} {surname} about the 2016 wildfires.",
+            "LCSH_Topic_1": generator.choice(TOPICS),
+            "LCSH_Geo_1": "Gatlinburg (Tenn.)",
+        }
+    )
+    step = max(stop // (questions + 1), 1)
+    for number in range(1, questions + 1):
+        row[f"Interview_Question_{number}"] = f"Question {number} for {given_name}?"
+        row[f"Interview_Question_{number}_TC"] = timecode(number * step)
+    step = max(stop // (chapters + 1), 1)
+    for number in range(1, chapters + 1):
+        row[f"Chapter_{number}"] = f"Chapter {number}"
+        row[f"Chapter_{number}_TC"] = (
+            f"{timecode((number - 1) * step)} - {timecode(number * step)}"
+        )
+    return row
+
+
+def write_csv(path, rows, questions=18, chapters=3, seed=0):
+    """Write a pipe-delimited metadata CSV of synthetic rows, one row at a time."""
+    generator = random.Random(seed)
+    with open(path, "w", newline="") as my_csv:
+        writer = csv.DictWriter(my_csv, HEADER, delimiter="|", quotechar="%")
+        writer.writeheader()
+        for index in range(rows):
+            writer.writerow(synthetic_row(generator, index, questions, chapters))
+    return path
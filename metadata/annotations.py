@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+from transcript.vtt import iter_vtt_cues
+from .files import atomic_write
+from .manifest import CONTEXT, MANIFEST_BASE_URL, canvas_id
+from .timecode import media_fragment, parse_timecode
+
+logger = logging.getLogger(__name__)
+
+
+def match_transcripts(vtt_path, identifiers):
+    """Map intellectual unit ids to the VTT files whose names start with them.
+
+    This is the prefix match SRTConverter uses for only, so a transcript named
+    20190920_James_Zachary_corrected.vtt belongs to 20190920_James_Zachary. The
+    longest matching id wins; VTTs matching no id are logged and left out.
+    """
+    identifiers = sorted(identifiers, key=len, reverse=True)
+    transcripts = {}
+    for filename in sorted(os.listdir(vtt_path)):
+        if not filename.endswith(".vtt"):
+            continue
+        identifier = next(
+            (
+                identifier
+                for identifier in identifiers
+                if filename.startswith(identifier)
+            ),
+            None,
+        )
+        if identifier is None:
+            logger.warning("%s matches no intellectual unit", filename)
+        elif identifier in transcripts:
+            logger.warning(
+                "%s and %s both match %s; keeping the first",
+                os.path.basename(transcripts[identifier]),
+                filename,
+                identifier,
+            )
+        else:
+            transcripts[identifier] = os.path.join(vtt_path, filename)
+    return transcripts
+
+
+class AnnotationPageWriter:
+    """Write transcripts as paged IIIF supplementing annotations.
+
+    Cues are streamed from each VTT file and at most one page of annotations is held in
+    memory: a full page is written as soon as the next cue shows it needs a "next" link.
+    The pages belong to an AnnotationCollection, written last once the total is known.
+    Ids follow the manifest ids, so 20190920_James_Zachary gets
+    <base_url>20190920_James_Zachary-annotations.json and numbered pages beside it.
+    write_file returns references to the pages, which ManifestWriter adds to the
+    annotations of the manifest's Canvas. Each annotation targets a time range of that
+    Canvas.
+    """
+
+    def __init__(self, base_url=MANIFEST_BASE_URL, page_size=500):
+        self.base_url = base_url
+        self.page_size = page_size
+
+    def collection_name(self, identifier):
+        return f"{identifier}-annotations.json"
+
+    def page_name(self, identifier, number):
+        return f"{identifier}-annotations-{number}.json"
+
+    def annotation(self, identifier, number, cue):
+        """Build the supplementing Annotation for one cue, targeting its time range."""
+        start = parse_timecode(cue.start)
+        end = parse_timecode(cue.end)
+        return {
+            "id": f"{self.base_url}{identifier}/annotation/{number}",
+            "type": "Annotation",
+            "motivation": "supplementing",
+            "body": {
+                "type": "TextualBody",
+                "value": "\n".join(cue.lines),
+                "format": "text/plain",
+                "language": "en",
+            },
+            "target": f"{canvas_id(identifier)}{media_fragment(start, end)}",
+        }
+
+    @staticmethod
+    def __write_json(document, path):
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+        with atomic_write(path) as temporary, open(
+            temporary, "w", encoding="utf-8"
+        ) as output:
+            output.writelines(encoder.iterencode(document))
+
+    def __write_page(self, identifier, number, start_index, items, last, output_path):
+        page = {
+            "@context": CONTEXT,
+            "id": f"{self.base_url}{self.page_name(identifier, number)}",
+            "type": "AnnotationPage",
+            "partOf": [
+                {
+                    "id": f"{self.base_url}{self.collection_name(identifier)}",
+                    "type": "AnnotationCollection",
+                }
+            ],
+            "startIndex": start_index,
+            "items": items,
+        }
+        if not last:
+            page["next"] = {
+                "id": f"{self.base_url}{self.page_name(identifier, number + 1)}",
+                "type": "AnnotationPage",
+            }
+        self.__write_json(
+            page, os.path.join(output_path, self.page_name(identifier, number))
+        )
+
+    def write_file(self, vtt_file, identifier, output_path):
+        """Write one transcript's pages and collection, returning the page references."""
+        os.makedirs(output_path, exist_ok=True)
+        pages = 0
+        total = 0
+        items = []
+        with open(vtt_file, "r", encoding="utf-8-sig") as vtt:
+            for cue in iter_vtt_cues(vtt):
+                if len(items) == self.page_size:
+                    pages += 1
+                    self.__write_page(
+                        identifier, pages, total - len(items), items, False, output_path
+                    )
+                    items = []
+                items.append(self.annotation(identifier, total, cue))
+                total += 1
+        pages += 1
+        self.__write_page(
+            identifier, pages, total - len(items), items, True, output_path
+        )
+        collection = {
+            "@context": CONTEXT,
+            "id": f"{self.base_url}{self.collection_name(identifier)}",
+            "type": "AnnotationCollection",
+            "label": {"en": ["Transcript"]},
+            "total": total,
+            "first": {
+                "id": f"{self.base_url}{self.page_name(identifier, 1)}",
+                "type": "AnnotationPage",
+            },
+            "last": {
+                "id": f"{self.base_url}{self.page_name(identifier, pages)}",
+                "type": "AnnotationPage",
+            },
+        }
+        self.__write_json(
+            collection, os.path.join(output_path, self.collection_name(identifier))
+        )
+        return [
+            {
+                "id": f"{self.base_url}{self.page_name(identifier, number)}",
+                "type": "AnnotationPage",
+            }
+            for number in range(1, pages + 1)
+        ]
+
+    def write_files(self, vtt_path, identifiers, output_path):
+        """Write annotations for every VTT matching an intellectual unit id.
+
+        Returns the page references keyed by id, ready for ManifestWriter(annotations=).
+        """
+        return {
+            identifier: self.write_file(vtt_file, identifier, output_path)
+            for identifier, vtt_file in match_transcripts(vtt_path, identifiers).items()
+        }
+
+
+if __name__ == "__main__":
+    from .index import CSVIndex
+    from .manifest import ManifestWriter
+    from .reader import MetadataReader
+
+    annotations = AnnotationPageWriter().write_files(
+        "data/web_vtt_files", CSVIndex("data/metadata.csv").offsets, "data/manifests"
+    )
+    ManifestWriter(annotations=annotations).write_files(
+        MetadataReader("data/metadata.csv").iter_interviews(), "data/manifests"
+    )
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import time
+from .files import atomic_write
+
+URI = re.compile(r"https?://\S+")
+GEONAMES_URI = "https://sws.geonames.org/{}/"
+LABEL_PREDICATES = (
+    "http://www.w3.org/2004/02/skos/core#prefLabel",
+    "http://www.loc.gov/mads/rdf/v1#authoritativeLabel",
+)
+TRIPLE = re.compile(
+    r'^<(?P<subject>[^>]+)>\s+<(?P<predicate>[^>]+)>\s+"(?P<label>(?:[^"\\]|\\.)*)"'
+    r"(?:@(?P<language>[A-Za-z-]+)|\^\^<[^>]+>)?\s*\.\s*$"
+)
+
+
+def embedded_uri(value):
+    """Return the first URI written inside a cell, such as an AAT or GeoNames link."""
+    match = URI.search(value)
+    return match.group(0) if match else None
+
+
+def _read_ntriples(path):
+    """Yield (label, uri) from the English prefLabel or authoritativeLabel triples."""
+    with open(path, "r", encoding="utf-8") as dump:
+        for line in dump:
+            match = TRIPLE.match(line)
+            if match is None or match["predicate"] not in LABEL_PREDICATES:
+                continue
+            if match["language"] and not match["language"].lower().startswith("en"):
+                continue
+            try:
+                label = json.loads(f'"{match["label"]}"')
+            except ValueError:
+                label = match["label"]
+            yield label, match["subject"]
+
+
+def _read_geonames(path):
+    """Yield (name, uri) from a GeoNames dump such as allCountries.txt."""
+    with open(path, "r", encoding="utf-8") as dump:
+        for row in csv.reader(dump, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) > 1:
+                yield row[1], GEONAMES_URI.format(row[0])
+
+
+def _read_tsv(path):
+    """Yield (label, uri) from a two column label<TAB>uri file."""
+    with open(path, "r", encoding="utf-8") as dump:
+        for row in csv.reader(dump, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) > 1:
+                yield row[0], row[1]
+
+
+READERS = {"nt": _read_ntriples, "geonames": _read_geonames, "tsv": _read_tsv}
+
+
+class AuthorityIndex:
+    """Offline lookup from a vocabulary label to its authority URI.
+
+    The index is a SQLite table keyed on (vocabulary, label), built once from local
+    dumps with build(), so resolving the LCSH, AAT and location columns never touches
+    the network. Lookups are memoized per process. Only the database path is pickled,
+    so an index can be handed to a process pool and each worker opens its own read-only
+    connection.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.__connection = None
+        self.__signature = None
+        self.__resolved = {}
+
+    def __getstate__(self):
+        return {"database": self.database}
+
+    def __setstate__(self, state):
+        self.__init__(state["database"])
+
+    def __connect(self):
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(
+                f"file:{self.database}?mode=ro", uri=True, check_same_thread=False
+            )
+        return self.__connection
+
+    @property
+    def signature(self):
+        """When the index was built, so cached manifests follow a rebuilt index."""
+        if self.__signature is None:
+            row = (
+                self.__connect()
+                .execute("SELECT value FROM meta WHERE name = 'built'")
+                .fetchone()
+            )
+            self.__signature = row[0] if row else ""
+        return self.__signature
+
+    def resolve(self, vocabulary, label):
+        """Return the URI for a label in a vocabulary, or None if it isn't indexed."""
+        key = (vocabulary, label)
+        if key not in self.__resolved:
+            row = (
+                self.__connect()
+                .execute(
+                    "SELECT uri FROM terms WHERE vocabulary = ? AND label = ?", key
+                )
+                .fetchone()
+            )
+            self.__resolved[key] = row[0] if row else None
+        return self.__resolved[key]
+
+    def close(self):
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    @classmethod
+    def build(cls, database, sources):
+        """Build an index from (vocabulary, path, format) sources and return it.
+
+        format is one of READERS: "nt" for N-Triples dumps such as LCSH and AAT,
+        "geonames" for GeoNames tab separated dumps and "tsv" for label<TAB>uri files.
+        The first URI seen for a label wins. The database is written to a temporary path
+        and moved into place, so a running build never sees half an index.
+        """
+        with atomic_write(database) as temporary:
+            connection = sqlite3.connect(temporary)
+            try:
+                with connection:
+                    connection.execute(
+                        "CREATE TABLE terms (vocabulary TEXT, label TEXT, uri TEXT, "
+                        "PRIMARY KEY (vocabulary, label)) WITHOUT ROWID"
+                    )
+                    connection.execute(
+                        "CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)"
+                    )
+                    for vocabulary, path, source_format in sources:
+                        connection.executemany(
+                            "INSERT OR IGNORE INTO terms VALUES (?, ?, ?)",
+                            (
+                                (vocabulary, label.strip(), uri)
+                                for label, uri in READERS[source_format](path)
+                            ),
+                        )
+                    connection.execute(
+                        "INSERT INTO meta VALUES ('built', ?)", (repr(time.time()),)
+                    )
+            finally:
+                connection.close()
+        return cls(database)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build an offline authority index from local vocabulary dumps."
+    )
+    parser.add_argument("database")
+    parser.add_argument(
+        "--source",
+        nargs=3,
+        action="append",
+        required=True,
+        metavar=("VOCABULARY", "PATH", "FORMAT"),
+        help=f"e.g. --source lcsh subjects.nt nt; FORMAT is one of {', '.join(READERS)}",
+    )
+    args = parser.parse_args()
+    AuthorityIndex.build(args.database, args.source).close()
@@ -0,0 +1,99 @@
+from hashlib import sha256
+import json
+import os
+import re
+import shutil
+from .files import atomic_write
+from .mapping import MAPPING_FILE, mapping_digest
+
+# Bump whenever a change to the generator alters its output, so stale manifests are
+# never served from an old cache.
+GENERATOR_VERSION = "7"
+VERSION_DIRECTORY = re.compile(r"v\d+")
+
+
+class ManifestCache:
+    """On-disk cache of generated manifests keyed on a hash of their CSV row.
+
+    Keys cover the row, the generator version, the id scheme, the authority index and
+    the contents of the mapping file. Entries live under a directory per generator
+    version. Reading an entry refreshes its
+    modification time, so collect_garbage() can drop other versions and then evict the
+    least recently used entries until the cache fits in max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_bytes=256 * 1024 * 1024,
+        version=GENERATOR_VERSION,
+        mapping=MAPPING_FILE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.mapping = mapping
+        self.root = os.path.join(directory, f"v{version}")
+
+    def key(self, row, id_scheme="uuid5", authority=None):
+        """Hash a CSV row together with everything else that shapes its manifest."""
+        signature = None if authority is None else authority.signature
+        payload = json.dumps(
+            [
+                self.version,
+                mapping_digest(self.mapping),
+                id_scheme,
+                signature,
+                list(row.items()),
+            ]
+        )
+        return sha256(payload.encode("utf-8")).hexdigest()
+
+    def __path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self.__path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as entry:
+                metadata_v3 = json.load(entry)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return metadata_v3
+
+    def put(self, key, metadata_v3):
+        path = self.__path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_write(path) as temporary, open(
+            temporary, "w", encoding="utf-8"
+        ) as entry:
+            json.dump(metadata_v3, entry, ensure_ascii=False)
+
+    def collect_garbage(self):
+        """Drop other generator versions, then evict least recently used entries.
+
+        Only v<number> directories are treated as versions, so anything else sharing the
+        cache directory is left alone.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for version in os.listdir(self.directory):
+            path = os.path.join(self.directory, version)
+            if (
+                path != self.root
+                and VERSION_DIRECTORY.fullmatch(version)
+                and os.path.isdir(path)
+            ):
+                shutil.rmtree(path)
+        entries = []
+        for path, directories, files in os.walk(self.root):
+            for file in files:
+                stat = os.stat(os.path.join(path, file))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(path, file)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,78 @@
+from functools import lru_cache
+from .mapping import compile_metadata_fields
+
+DESCRIPTIVE_COLUMNS = (
+    "UT Intellectual Unit - YYYYMMDD_Lastname_Firstname",
+    "Title",
+    "Interview Stop TC",
+    "License",
+    "Date Recorded",
+    "Abstract",
+)
+
+
+class ColumnPlan:
+    """Column layout of a metadata CSV, compiled once per header.
+
+    Rows come from DictReader, so columns are addressed by their header key. Every
+    Interview built from the same header shares one plan instead of re-scanning its row.
+    The plan also holds the metadata fields compiled from mapping.yml.
+    """
+
+    def __init__(self, header):
+        self.header = tuple(header)
+        self.questions = self.__compile_questions()
+        self.chapters = self.__compile_chapters()
+        self.metadata = compile_metadata_fields(self.header)
+        self.metadata_fields = {field.key: field for field in self.metadata}
+        self.used_columns = self.__compile_used_columns()
+
+    def __reduce__(self):
+        # Process pools get the header alone and recompile, once per worker.
+        return compile_column_plan, (self.header,)
+
+    def __timecode_key(self, key):
+        timecode_key = f"{key}_TC"
+        return timecode_key if timecode_key in self.header else None
+
+    def __numbered_keys(self, prefix):
+        return [
+            key
+            for key in self.header
+            if key.startswith(prefix) and key[len(prefix) :].isdigit()
+        ]
+
+    def __compile_questions(self):
+        """Return (question, timecode, next timecode) keys in header order."""
+        questions = []
+        for key in self.__numbered_keys("Interview_Question_"):
+            number = int(key.split("_")[2])
+            questions.append(
+                (
+                    key,
+                    self.__timecode_key(key),
+                    self.__timecode_key(f"Interview_Question_{number + 1}"),
+                )
+            )
+        return tuple(questions)
+
+    def __compile_chapters(self):
+        """Return (chapter, timecode) keys in header order."""
+        return tuple(
+            (key, self.__timecode_key(key)) for key in self.__numbered_keys("Chapter_")
+        )
+
+    def __compile_used_columns(self):
+        """Return every column an Interview reads, in header order."""
+        used = set(DESCRIPTIVE_COLUMNS)
+        for field in self.metadata:
+            used.update(field.columns)
+        for columns in self.questions + self.chapters:
+            used.update(column for column in columns if column)
+        return tuple(column for column in self.header if column in used)
+
+
+@lru_cache(maxsize=32)
+def compile_column_plan(header):
+    """Return the shared ColumnPlan for a header, given as a tuple of column names."""
+    return ColumnPlan(header)
@@ -0,0 +1,51 @@
+from functools import lru_cache
+import sys
+from .manifest import STRUCTURE_FIELDS
+from .mapping import metadata_keys
+
+
+@lru_cache(maxsize=65536)
+def shared_label(text):
+    """Return the one {"en": [text]} label dict used for every occurrence of text."""
+    return {"en": [sys.intern(text)]}
+
+
+@lru_cache(maxsize=65536)
+def shared_entry(label, values):
+    """Return the one metadata entry used for every row with this label and values."""
+    return {"label": shared_label(label), "value": {"en": list(values)}}
+
+
+@lru_cache(maxsize=65536)
+def shared_rights(rights):
+    return {"rights": sys.intern(rights)}
+
+
+def compact_metadata(metadata_v3):
+    """Share the constant and repeated parts of one metadata_v3 dict, in place.
+
+    Labels, whole metadata entries and rights statements that repeat across rows point at
+    the same objects, and repeated cell values are interned. The dict still serializes
+    exactly as before, but the shared parts must be treated as read-only: mutating one
+    would change it for every interview holding it.
+    """
+    for key in metadata_keys():
+        entry = metadata_v3.get(key)
+        if entry:
+            metadata_v3[key] = shared_entry(
+                entry["label"]["en"][0],
+                tuple(sys.intern(value) for value in entry["value"]["en"]),
+            )
+    if "rights" in metadata_v3:
+        metadata_v3["rights"] = shared_rights(metadata_v3["rights"]["rights"])
+    for key in STRUCTURE_FIELDS:
+        structure = metadata_v3.get(key)
+        if not structure:
+            continue
+        structure["id"] = sys.intern(structure["id"])
+        structure["label"] = shared_label(structure["label"]["en"][0])
+        for item in structure["items"]:
+            item["label"] = shared_label(item["label"]["en"][0])
+            for canvas in item["items"]:
+                canvas["id"] = sys.intern(canvas["id"])
+    return metadata_v3
@@ -0,0 +1,38 @@
+from datetime import date
+from functools import lru_cache
+import re
+
+SHORT_DATE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})(?: \(\?\))?$")
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(value):
+    """Convert a Date Recorded value to an XSD dateTime for navDate.
+
+    M/D/YYYY values, with or without a trailing "(?)" marking an uncertain date, are
+    converted directly; anything else falls back to arrow. Each distinct value is
+    converted once per process, and unreadable dates become "".
+    """
+    if not value.strip():
+        return ""
+    match = SHORT_DATE.match(value)
+    if match is None:
+        return _arrow_date(value)
+    month, day, year = match.groups()
+    try:
+        return f"{date(int(year), int(month), int(day)).isoformat()}T00:00:00Z"
+    except ValueError:
+        return ""
+
+
+def _arrow_date(value):
+    import arrow
+
+    try:
+        split_date = value.split("/")
+        for i, unit in enumerate(split_date):
+            if len(unit) == 1:
+                split_date[i] = f"0{unit}"
+        return f"{str(arrow.get('/'.join(split_date), 'MM/DD/YYYY').format('YYYY-MM-DD'))}T00:00:00Z"
+    except (arrow.parser.ParserMatchError, ValueError):
+        return ""
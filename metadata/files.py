@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+import os
+
+
+@contextmanager
+def atomic_write(path):
+    """Yield a temporary path to write instead of path, then move it into place.
+
+    The temporary file sits beside path and includes the process id, so concurrent
+    writers never share one. It replaces path only if the block finishes, and is
+    removed otherwise, so readers never see a partial file.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
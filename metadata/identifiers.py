@@ -0,0 +1,24 @@
+from uuid import NAMESPACE_URL, uuid4, uuid5
+
+RANGE_NAMESPACE = uuid5(NAMESPACE_URL, "https://digital.lib.utk.edu/collections/rfta/")
+ID_SCHEMES = ("uuid5", "content", "uuid4")
+
+
+def range_id(identifier, column, scheme="uuid5", content=()):
+    """Build the id of one Range.
+
+    uuid5 names the range after the interview's intellectual unit and the column it came
+    from, so it stays fixed between runs. content also hashes the range's label and
+    timecodes, so the id changes whenever what the range points at does. uuid4 is random
+    and matches the original behaviour.
+    """
+    if scheme == "uuid5":
+        return uuid5(RANGE_NAMESPACE, f"{identifier}/{column}")
+    if scheme == "content":
+        name = "\x1f".join((identifier, column, *map(str, content)))
+        return uuid5(RANGE_NAMESPACE, name)
+    if scheme == "uuid4":
+        return uuid4()
+    raise ValueError(
+        f"Unknown range id scheme {scheme!r}; expected one of {ID_SCHEMES}"
+    )
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import logging
+import mmap
+import os
+from .files import atomic_write
+
+IDENTIFIER = "UT Intellectual Unit - YYYYMMDD_Lastname_Firstname"
+
+logger = logging.getLogger(__name__)
+
+
+class CSVIndex:
+    """Byte offset of every row in a metadata CSV, keyed by intellectual unit.
+
+    The index is built by running csv.reader over a memory map of the file, so the %
+    quotechar and newlines inside quoted fields are honored exactly as MetadataReader
+    honors them. It is saved next to the CSV and rebuilt whenever the CSV's size or
+    modification time changes. get_row() then seeks straight to a single row.
+    """
+
+    def __init__(self, metadata_file, index_file=None):
+        self.filename = metadata_file
+        self.index_file = index_file or f"{metadata_file}.idx.json"
+        stat = os.stat(metadata_file)
+        self.__signature = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        index = self.__load() or self.__build()
+        self.header = index["header"]
+        self.offsets = index["offsets"]
+
+    def __load(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if index.get("signature") != self.__signature:
+            return None
+        return index
+
+    @staticmethod
+    def __lines(memory_map):
+        for line in iter(memory_map.readline, b""):
+            yield line.decode("utf-8")
+
+    def __build(self):
+        offsets = {}
+        with open(self.filename, "rb") as my_csv, mmap.mmap(
+            my_csv.fileno(), 0, access=mmap.ACCESS_READ
+        ) as memory_map:
+            reader = csv.reader(self.__lines(memory_map), delimiter="|", quotechar="%")
+            header = next(reader, [])
+            if IDENTIFIER not in header:
+                raise ValueError(f"{self.filename} has no {IDENTIFIER!r} column")
+            identifier = header.index(IDENTIFIER)
+            start = memory_map.tell()
+            for row in reader:
+                end = memory_map.tell()
+                key = row[identifier] if identifier < len(row) else ""
+                if key in offsets:
+                    logger.warning(
+                        "Duplicate intellectual unit %s; keeping the first", key
+                    )
+                elif key:
+                    offsets[key] = [start, end]
+                start = end
+        index = {"signature": self.__signature, "header": header, "offsets": offsets}
+        with atomic_write(self.index_file) as temporary, open(
+            temporary, "w", encoding="utf-8"
+        ) as index_file:
+            json.dump(index, index_file)
+        return index
+
+    def __contains__(self, identifier):
+        return identifier in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get_row(self, identifier):
+        """Return one CSV row as a dict, like DictReader would, or None if it's absent."""
+        if identifier not in self.offsets:
+            return None
+        start, end = self.offsets[identifier]
+        with open(self.filename, "rb") as my_csv, mmap.mmap(
+            my_csv.fileno(), 0, access=mmap.ACCESS_READ
+        ) as memory_map:
+            text = memory_map[start:end].decode("utf-8")
+        row = next(
+            csv.reader(io.StringIO(text, newline=None), delimiter="|", quotechar="%")
+        )
+        return dict(zip(self.header, row))
@@ -0,0 +1,145 @@
+from collections import Counter
+import json
+import marshal
+from time import perf_counter
+
+counters = Counter()
+enabled = False
+timing = False
+timings = {}
+locations = {}
+ROW = "Interview row"
+
+
+class Histogram:
+    """Durations bucketed by powers of two microseconds."""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+        self.buckets = Counter()
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        self.buckets[int(seconds * 1_000_000).bit_length()] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.minimum,
+            "max": self.maximum,
+            "buckets": {
+                f"<{1 << bucket}us": self.buckets[bucket]
+                for bucket in sorted(self.buckets)
+            },
+        }
+
+
+def enable():
+    """Start collecting per-phase counters such as ranges built and timecodes parsed.
+
+    Call sites check the module-level enabled flag before touching counters, so a
+    disabled build pays for one attribute lookup and nothing else. Counters are kept per
+    process, so parallel builds only report what the parent process did.
+    """
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Stop collecting counters, keeping whatever was gathered so far."""
+    global enabled
+    enabled = False
+
+
+def enable_timing():
+    """Start timing every getter called while an Interview is generated.
+
+    Like the counters, timings are only checked through a module-level flag, so a build
+    with timing disabled runs the untimed path unchanged.
+    """
+    global timing
+    timing = True
+
+
+def disable_timing():
+    """Stop timing getters, keeping whatever was gathered so far."""
+    global timing
+    timing = False
+
+
+def reset():
+    """Clear every counter and timing."""
+    counters.clear()
+    timings.clear()
+    locations.clear()
+
+
+def snapshot():
+    """Return the current counters as a plain dict."""
+    return dict(counters)
+
+
+def _record(name, seconds, code=None):
+    if name not in timings:
+        timings[name] = Histogram()
+        if code is not None:
+            locations[name] = (code.co_filename, code.co_firstlineno, name)
+    timings[name].add(seconds)
+
+
+def time_fields(instance, fields):
+    """Build a dict from (key, getter) pairs, timing each getter and the whole row.
+
+    Getters without a __qualname__, such as the fields compiled from mapping.yml, are
+    reported as "mapping.<key>".
+    """
+    row_started = perf_counter()
+    result = {}
+    for key, getter in fields:
+        started = perf_counter()
+        result[key] = getter(instance)
+        _record(
+            getattr(getter, "__qualname__", f"mapping.{key}"),
+            perf_counter() - started,
+            getattr(getter, "__code__", None),
+        )
+    _record(ROW, perf_counter() - row_started)
+    return result
+
+
+def timing_report():
+    """Return per-getter and per-row histograms as a plain dict."""
+    return {name: histogram.as_dict() for name, histogram in timings.items()}
+
+
+def export_json(path):
+    with open(path, "w") as report:
+        json.dump(
+            {"counters": snapshot(), "timings": timing_report()}, report, indent=2
+        )
+
+
+def export_pstats(path):
+    """Write getter timings in the marshal format read by pstats.Stats and snakeviz."""
+    stats = {
+        locations.get(name, ("~", 0, name)): (
+            histogram.count,
+            histogram.count,
+            histogram.total,
+            histogram.total,
+            {},
+        )
+        for name, histogram in timings.items()
+    }
+    with open(path, "wb") as report:
+        marshal.dump(stats, report)
@@ -0,0 +1,146 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+from .files import atomic_write
+from .mapping import metadata_keys
+
+CONTEXT = "http://iiif.io/api/presentation/3/context.json"
+MANIFEST_BASE_URL = "https://digital.lib.utk.edu/manifests/"
+STRUCTURE_FIELDS = ("interview question", "chapters")
+
+logger = logging.getLogger(__name__)
+
+
+def canvas_id(identifier):
+    """Return the id of the one Canvas in an interview's manifest.
+
+    Ranges and transcript annotations target this id with a #t= media fragment.
+    """
+    return f"{MANIFEST_BASE_URL}{identifier}/canvas/1"
+
+
+def build_manifest(metadata_v3, manifest_id, annotations=None):
+    """Arrange a metadata_v3 dict as an IIIF Presentation 3 Manifest, as in mapping.yml.
+
+    The recording is one Canvas lasting metadata_v3["duration"] seconds. annotations, if
+    given, are references to the transcript's AnnotationPages and go on the Canvas. The
+    Canvas has no painting annotation yet, because the CSV doesn't say where the audio
+    or video file is. Until one is added, viewers can show the structure and transcript
+    but can't play the recording.
+    """
+    manifest = {"@context": CONTEXT, "id": manifest_id, "type": "Manifest"}
+    manifest.update(metadata_v3["label"])
+    manifest.update(metadata_v3["summary"])
+    if metadata_v3["navDate"]:
+        manifest["navDate"] = metadata_v3["navDate"]
+    manifest["metadata"] = [
+        metadata_v3[field]
+        for field in metadata_keys()
+        if metadata_v3[field]["value"]["en"]
+    ]
+    manifest.update(metadata_v3["rights"])
+    if metadata_v3.get("links"):
+        manifest["seeAlso"] = metadata_v3["links"]
+    canvas = {"id": canvas_id(metadata_v3["identifier"]), "type": "Canvas"}
+    if metadata_v3["duration"] is not None:
+        canvas["duration"] = metadata_v3["duration"]
+    else:
+        logger.warning("%s has no timecodes to give its Canvas a duration", manifest_id)
+    if annotations:
+        canvas["annotations"] = annotations
+    manifest["items"] = [canvas]
+    structures = [
+        metadata_v3[field] for field in STRUCTURE_FIELDS if metadata_v3.get(field)
+    ]
+    if structures:
+        manifest["structures"] = structures
+    return manifest
+
+
+class ManifestWriter:
+    """Write manifests to disk one at a time with an incremental JSON encoder.
+
+    Each manifest is encoded in chunks straight into a buffered file, so neither a whole
+    collection nor a whole serialized manifest is held in memory. Files are written to a
+    temporary path and moved into place, so readers never see a partial file. annotations
+    maps intellectual unit ids to the AnnotationPage references AnnotationPageWriter
+    returns.
+    """
+
+    def __init__(
+        self, base_url=MANIFEST_BASE_URL, buffer_size=1 << 16, annotations=None
+    ):
+        self.base_url = base_url
+        self.buffer_size = buffer_size
+        self.annotations = annotations or {}
+
+    def manifest_id(self, identifier):
+        return f"{self.base_url}{identifier}.json"
+
+    def manifest(self, metadata_v3):
+        identifier = metadata_v3["identifier"]
+        return build_manifest(
+            metadata_v3, self.manifest_id(identifier), self.annotations.get(identifier)
+        )
+
+    @contextmanager
+    def __open(self, path):
+        with atomic_write(path) as temporary, open(
+            temporary, "w", encoding="utf-8", buffering=self.buffer_size
+        ) as output:
+            yield output
+
+    @staticmethod
+    def __has_identifier(metadata_v3):
+        if metadata_v3["identifier"].strip():
+            return True
+        logger.warning(
+            "Skipping %r: it has no UT Intellectual Unit", metadata_v3["label"]["label"]
+        )
+        return False
+
+    def write_file(self, metadata_v3, directory, indent=2):
+        """Write one manifest to <identifier>.json in directory and return its path.
+
+        A row without an intellectual unit is skipped with a warning and gives None.
+        """
+        if not self.__has_identifier(metadata_v3):
+            return None
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+        path = os.path.join(
+            directory, f"{metadata_v3['identifier'].replace(os.sep, '_')}.json"
+        )
+        with self.__open(path) as output:
+            output.writelines(encoder.iterencode(self.manifest(metadata_v3)))
+        return path
+
+    def write_files(self, interviews, directory, indent=2):
+        """Write each manifest to its own file in directory and return the paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = (
+            self.write_file(metadata_v3, directory, indent)
+            for metadata_v3 in interviews
+        )
+        return [path for path in paths if path is not None]
+
+    def write_ndjson(self, interviews, path):
+        """Write every manifest to one NDJSON file, one manifest per line."""
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        written = 0
+        with self.__open(path) as output:
+            for metadata_v3 in interviews:
+                if not self.__has_identifier(metadata_v3):
+                    continue
+                output.writelines(encoder.iterencode(self.manifest(metadata_v3)))
+                output.write("\n")
+                written += 1
+        return written
+
+
+if __name__ == "__main__":
+    from .reader import MetadataReader
+
+    ManifestWriter().write_files(
+        MetadataReader("data/metadata.csv").iter_interviews(), "data/manifests"
+    )
@@ -0,0 +1,123 @@
+from functools import lru_cache
+from hashlib import sha256
+import os
+
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mapping.yml")
+
+
+def first_line(value):
+    return value.split("\n")[0]
+
+
+def strip_aat_uri(value):
+    return value.split("http://vocab.getty.edu/aat/")[0].rstrip()
+
+
+TRANSFORMS = {"first_line": first_line, "strip_aat_uri": strip_aat_uri}
+
+
+class MetadataField:
+    """One entry of the metadata section of mapping.yml, compiled against a CSV header."""
+
+    __slots__ = ("key", "label", "columns", "transform", "skip_empty", "authority")
+
+    def __init__(
+        self, key, label, columns, transform=None, skip_empty=False, authority=None
+    ):
+        self.key = key
+        self.label = label
+        self.columns = columns
+        self.transform = transform
+        self.skip_empty = skip_empty
+        self.authority = authority
+
+    def extract(self, row):
+        """Build the {"label": ..., "value": ...} metadata entry for one row."""
+        values = [row[column] for column in self.columns]
+        if self.skip_empty:
+            values = [value for value in values if value != ""]
+        if self.transform is not None:
+            values = [self.transform(value) for value in values]
+        return {"label": {"en": [self.label]}, "value": {"en": values}}
+
+    def links(self, row, index):
+        """Link each value to its authority URI as a seeAlso entry.
+
+        A URI written in the cell itself, like the AAT URI or the GeoNames URI on the
+        second line of a location, is used as is; otherwise the cleaned value is looked
+        up in the AuthorityIndex under this field's vocabulary.
+        """
+        from .authority import embedded_uri
+
+        links = []
+        for column in self.columns:
+            value = row[column]
+            if value == "":
+                continue
+            label = (self.transform(value) if self.transform else value).strip()
+            uri = embedded_uri(value) or index.resolve(self.authority, label)
+            if uri is not None:
+                links.append({"id": uri, "type": "Dataset", "label": {"en": [label]}})
+        return links
+
+    def __call__(self, interview):
+        return self.extract(interview.csv_data)
+
+
+def resolve_columns(placeholder, header):
+    """Find the columns a mapping placeholder such as "[LCSH_Topic_#]" refers to."""
+    name = placeholder.strip()[1:-1]
+    if "#" not in name:
+        return tuple(column for column in header if column == name)
+    prefix = name.split("#")[0]
+    numbered = {}
+    for column in header:
+        if column == prefix.rstrip(" _"):
+            numbered[column] = 1
+        elif column.startswith(prefix) and column[len(prefix) :].isdigit():
+            numbered[column] = int(column[len(prefix) :])
+    return tuple(sorted(numbered, key=numbered.get))
+
+
+@lru_cache(maxsize=4)
+def read_mapping(path=MAPPING_FILE):
+    """Return the text of mapping.yml, read once per process."""
+    with open(path, "r") as mapping:
+        return mapping.read()
+
+
+@lru_cache(maxsize=4)
+def load_mapping(path=MAPPING_FILE):
+    """Parse the metadata entries of mapping.yml once per process."""
+    import yaml
+
+    return tuple(yaml.safe_load(read_mapping(path))["metadata"])
+
+
+def mapping_digest(path=MAPPING_FILE):
+    """Hash mapping.yml, so anything keyed on it follows edits to the mapping."""
+    return sha256(read_mapping(path).encode("utf-8")).hexdigest()
+
+
+def compile_metadata_fields(header, path=MAPPING_FILE):
+    """Compile every metadata entry of mapping.yml into a MetadataField for a header."""
+    return tuple(
+        MetadataField(
+            entry["key"],
+            entry["label"]["en"][0],
+            tuple(
+                column
+                for placeholder in entry["value"]["en"]
+                for column in resolve_columns(placeholder, header)
+            ),
+            TRANSFORMS[entry["transform"]] if "transform" in entry else None,
+            entry.get("skip_empty", False),
+            entry.get("authority"),
+        )
+        for entry in load_mapping(path)
+    )
+
+
+def metadata_keys(path=MAPPING_FILE):
+    """Return the metadata_v3 keys of the mapped fields in mapping.yml order."""
+    return tuple(entry["key"] for entry in load_mapping(path))
@@ -0,0 +1,216 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+import os
+import time
+from .manifest import ManifestWriter
+from .reader import MetadataReader, build_interview
+
+DONE = None
+
+
+class QueueMetrics:
+    """Depth of one pipeline queue, sampled every time an item enters or leaves it."""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def sample(self, queue):
+        depth = queue.qsize()
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    @property
+    def mean_depth(self):
+        return self.total_depth / self.samples if self.samples else 0.0
+
+    def as_dict(self):
+        return {
+            "maxsize": self.maxsize,
+            "samples": self.samples,
+            "mean_depth": self.mean_depth,
+            "max_depth": self.max_depth,
+        }
+
+
+class PipelineStats:
+    def __init__(self, queues):
+        self.queues = {metrics.name: metrics for metrics in queues}
+        self.rows_read = 0
+        self.manifests_written = 0
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return {
+            "rows_read": self.rows_read,
+            "manifests_written": self.manifests_written,
+            "elapsed": self.elapsed,
+            "queues": {
+                name: metrics.as_dict() for name, metrics in self.queues.items()
+            },
+        }
+
+
+class ManifestPipeline:
+    """Overlap CSV reading, manifest building and disk writes with asyncio.
+
+    A reader stage pulls rows off the CSV in a thread, a pool of builder tasks hands rows
+    to an executor (a process pool by default), and writer tasks save manifests through a
+    ManifestWriter in a thread pool. Bounded queues between the stages apply
+    backpressure, so memory is bounded by the queue sizes rather than the CSV. Queue
+    depths are recorded in the returned PipelineStats for tuning.
+    """
+
+    def __init__(
+        self,
+        metadata_file,
+        output_path,
+        builders=4,
+        writers=2,
+        rows_queue=64,
+        manifests_queue=64,
+        read_batch=16,
+        id_scheme="uuid5",
+        writer=None,
+        authority=None,
+    ):
+        self.reader = MetadataReader(metadata_file, id_scheme=id_scheme)
+        self.output_path = output_path
+        self.builders = builders
+        self.writers = writers
+        self.rows_queue = rows_queue
+        self.manifests_queue = manifests_queue
+        self.read_batch = read_batch
+        self.id_scheme = id_scheme
+        self.writer = writer or ManifestWriter()
+        self.authority = authority
+
+    async def __read(self, rows, io_executor, stats):
+        loop = asyncio.get_running_loop()
+        metrics = stats.queues["rows"]
+        iterator = self.reader.iter_rows()
+        while True:
+            batch = await loop.run_in_executor(
+                io_executor, list, islice(iterator, self.read_batch)
+            )
+            if not batch:
+                break
+            for row in batch:
+                await rows.put(row)
+                metrics.sample(rows)
+                stats.rows_read += 1
+        for _ in range(self.builders):
+            await rows.put(DONE)
+
+    async def __build(self, rows, manifests, executor, stats):
+        loop = asyncio.get_running_loop()
+        build = partial(
+            build_interview,
+            plan=self.reader.column_plan,
+            id_scheme=self.id_scheme,
+            authority=self.authority,
+        )
+        while True:
+            row = await rows.get()
+            stats.queues["rows"].sample(rows)
+            if row is DONE:
+                return
+            await manifests.put(await loop.run_in_executor(executor, build, row))
+            stats.queues["manifests"].sample(manifests)
+
+    async def __write(self, manifests, io_executor, stats):
+        loop = asyncio.get_running_loop()
+        while True:
+            metadata_v3 = await manifests.get()
+            stats.queues["manifests"].sample(manifests)
+            if metadata_v3 is DONE:
+                return
+            path = await loop.run_in_executor(
+                io_executor, self.writer.write_file, metadata_v3, self.output_path
+            )
+            if path is not None:
+                stats.manifests_written += 1
+
+    async def __close_writers(self, stages, manifests):
+        await asyncio.gather(*stages)
+        for _ in range(self.writers):
+            await manifests.put(DONE)
+
+    @staticmethod
+    async def __wait(tasks):
+        """Wait for every task, cancelling the rest as soon as one of them fails.
+
+        Without this a failed writer would leave the builders blocked on a full queue.
+        """
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    async def run(self, executor=None):
+        """Run every stage to completion and return the PipelineStats.
+
+        If any stage raises, the others are cancelled and the exception is re-raised.
+        """
+        started = time.perf_counter()
+        os.makedirs(self.output_path, exist_ok=True)
+        rows = asyncio.Queue(self.rows_queue)
+        manifests = asyncio.Queue(self.manifests_queue)
+        stats = PipelineStats(
+            [
+                QueueMetrics("rows", self.rows_queue),
+                QueueMetrics("manifests", self.manifests_queue),
+            ]
+        )
+        own_executor = executor is None
+        if own_executor:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=self.builders)
+        try:
+            with ThreadPoolExecutor(max_workers=self.writers + 1) as io_executor:
+                stages = [asyncio.create_task(self.__read(rows, io_executor, stats))]
+                stages += [
+                    asyncio.create_task(self.__build(rows, manifests, executor, stats))
+                    for _ in range(self.builders)
+                ]
+                tasks = [
+                    *stages,
+                    asyncio.create_task(self.__close_writers(stages, manifests)),
+                    *(
+                        asyncio.create_task(self.__write(manifests, io_executor, stats))
+                        for _ in range(self.writers)
+                    ),
+                ]
+                await self.__wait(tasks)
+        finally:
+            if own_executor:
+                executor.shutdown()
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def run_pipeline(metadata_file, output_path, executor=None, **options):
+    """Run a ManifestPipeline from synchronous code."""
+    return asyncio.run(
+        ManifestPipeline(metadata_file, output_path, **options).run(executor)
+    )
+
+
+if __name__ == "__main__":
+    import json
+
+    print(
+        json.dumps(
+            run_pipeline("data/metadata.csv", "data/manifests").as_dict(), indent=2
+        )
+    )
@@ -1,32 +1,174 @@
 from csv import DictReader
-import arrow
+from functools import partial
+from itertools import islice
+import logging
 from uuid import uuid4
+from . import instrumentation
+from .columns import compile_column_plan
+from .compact import compact_metadata
+from .dates import normalize_date
+from .identifiers import range_id
+from .manifest import canvas_id
+from .timecode import media_fragment, parse_timecode, split_timecode_range
+
+logger = logging.getLogger(__name__)
 
 
 class MetadataReader:
-    def __init__(self, metadata_file):
+    def __init__(
+        self,
+        metadata_file,
+        workers=1,
+        chunksize=16,
+        id_scheme="uuid5",
+        cache=None,
+        compact=False,
+        authority=None,
+    ):
         self.filename = metadata_file
-        self.original_interviews = self.__read_data(metadata_file)
-        self.interviews = self.__clean_interviews()
+        self.workers = workers
+        self.chunksize = chunksize
+        self.id_scheme = id_scheme
+        self.cache = cache
+        self.compact = compact
+        self.authority = authority
+        self.__original_interviews = None
+        self.__interviews = None
+        self.__column_plan = None
+
+    @property
+    def original_interviews(self):
+        """Every CSV row as a dict, read on first access."""
+        if self.__original_interviews is None:
+            self.__original_interviews = list(self.iter_rows())
+        return self.__original_interviews
+
+    @property
+    def interviews(self):
+        """Every generated manifest, built on first access."""
+        if self.__interviews is None:
+            self.__interviews = self.__clean_interviews()
+        return self.__interviews
+
+    @property
+    def column_plan(self):
+        """The ColumnPlan compiled once from the CSV header."""
+        if self.__column_plan is None:
+            with open(self.filename, "r") as my_csv:
+                self.__set_column_plan(
+                    DictReader(my_csv, delimiter="|", quotechar="%").fieldnames
+                )
+        return self.__column_plan
 
-    @staticmethod
-    def __read_data(path):
-        with open(path, "r") as my_csv:
-            return [
-                interview
-                for interview in DictReader(my_csv, delimiter="|", quotechar="%")
-            ]
+    def __set_column_plan(self, fieldnames):
+        self.__column_plan = compile_column_plan(tuple(fieldnames or ()))
+
+    def iter_rows(self):
+        """Stream CSV rows one at a time without materializing the file."""
+        with open(self.filename, "r") as my_csv:
+            reader = DictReader(my_csv, delimiter="|", quotechar="%")
+            if self.__column_plan is None:
+                self.__set_column_plan(reader.fieldnames)
+            for interview in reader:
+                if instrumentation.enabled:
+                    instrumentation.counters["rows read"] += 1
+                yield interview
+
+    def iter_interviews(self, workers=None):
+        """Stream generated metadata_v3 dicts one row at a time.
+
+        With more than one worker, rows are dispatched to a process pool in chunks of
+        self.chunksize, a bounded window at a time. Results are yielded in CSV order,
+        exactly as the serial path does. With a ManifestCache, rows whose hash is already
+        cached are not rebuilt, and the cache is garbage-collected once every row is read.
+        With compact=True, each dict goes through compact_metadata in this process, so
+        repeated labels and values are shared across the whole collection.
+        """
+        workers = self.workers if workers is None else workers
+        build = partial(
+            build_interview,
+            plan=self.column_plan,
+            id_scheme=self.id_scheme,
+            cache=self.cache,
+            authority=self.authority,
+        )
+        rows = (
+            self.__original_interviews
+            if self.__original_interviews is not None
+            else self.iter_rows()
+        )
+        for metadata_v3 in self.__build(rows, build, workers):
+            yield compact_metadata(metadata_v3) if self.compact else metadata_v3
+        if self.cache is not None:
+            self.cache.collect_garbage()
+
+    def __build(self, rows, build, workers):
+        if workers <= 1:
+            for interview in rows:
+                yield build(interview)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            rows = iter(rows)
+            window = workers * self.chunksize * 4
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batch = list(islice(rows, window))
+                while batch:
+                    yield from executor.map(build, batch, chunksize=self.chunksize)
+                    batch = list(islice(rows, window))
 
     def __clean_interviews(self):
-        return [
-            Interview(interview).metadata_v3 for interview in self.original_interviews
-        ]
+        return list(self.iter_interviews())
+
+
+def build_interview(
+    interview, plan=None, id_scheme="uuid5", cache=None, authority=None
+):
+    """Generate the metadata_v3 dict for a single CSV row, reusing a cached one if given."""
+    if cache is None:
+        return Interview(interview, plan, id_scheme, authority=authority).metadata_v3
+    key = cache.key(interview, id_scheme, authority)
+    metadata_v3 = cache.get(key)
+    if metadata_v3 is None:
+        metadata_v3 = Interview(
+            interview, plan, id_scheme, authority=authority
+        ).metadata_v3
+        cache.put(key, metadata_v3)
+    elif instrumentation.enabled:
+        instrumentation.counters["cache hits"] += 1
+    return metadata_v3
 
 
 class Interview:
-    def __init__(self, interview):
-        self.csv_data = interview
+    __slots__ = ("csv_data", "plan", "id_scheme", "authority", "metadata_v3")
+
+    def __init__(
+        self, interview, plan=None, id_scheme="uuid5", retain_row=True, authority=None
+    ):
+        """Generate metadata_v3 for one CSV row.
+
+        Only the columns the mapping reads are kept in csv_data. With retain_row=False
+        even those are released once metadata_v3 is built, which keeps large in-memory
+        collections of Interviews small; the get_* methods can't be called afterwards.
+        With an AuthorityIndex, metadata_v3 also gets the "links" used for seeAlso.
+        """
+        self.plan = plan if plan is not None else compile_column_plan(tuple(interview))
+        self.csv_data = {
+            column: interview[column]
+            for column in self.plan.used_columns
+            if column in interview
+        }
+        self.id_scheme = id_scheme
+        self.authority = authority
         self.metadata_v3 = self.__generate_interview()
+        if not retain_row:
+            self.csv_data = None
+        if instrumentation.enabled:
+            instrumentation.counters["interviews built"] += 1
+
+    def get_identifier(self):
+        """Use the UT Intellectual Unit to identify the interview and its manifest"""
+        return self.csv_data["UT Intellectual Unit - YYYYMMDD_Lastname_Firstname"]
 
     def get_interview_label(self):
         """Use Title to generate a label for the manifest according to the IIIF v3 specification"""
@@ -42,102 +184,65 @@ class Interview:
 
     def get_narrators(self):
         """Use values in narrator fields to get narrators to metadata section of a IIIF v3 metadata profile"""
-        narrators = [
-            narrator
-            for narrator in [
-                self.csv_data["Narrator Name"],
-                self.csv_data["Narrator Name 2"],
-                self.csv_data["Narrator Name 3"],
-            ]
-            if narrator != ""
-        ]
-        return {"label": {"en": ["Narrators"]}, "value": {"en": narrators}}
+        return self.plan.metadata_fields["narrators"].extract(self.csv_data)
 
     def get_interviewer(self):
         """Use value in interviewer field to get interviewers for metadata section of a IIIF v3 metadata profile"""
-        interviewers = [
-            interviewer
-            for interviewer in [
-                self.csv_data["Interviewer Name"],
-            ]
-            if interviewer != ""
-        ]
-        return {"label": {"en": ["Interviewers"]}, "value": {"en": interviewers}}
+        return self.plan.metadata_fields["interviewer"].extract(self.csv_data)
 
     def get_navigation_date(self):
         """Use date recorded as navDate for manifest"""
-        try:
-            split_date = self.csv_data["Date Recorded"].split("/")
-            for i, unit in enumerate(split_date):
-                if len(unit) == 1:
-                    split_date[i] = f"0{unit}"
-            return f"{str(arrow.get('/'.join(split_date), 'MM/DD/YYYY').format('YYYY-MM-DD'))}T00:00:00Z"
-        except arrow.parser.ParserMatchError:
-            return ""
+        return normalize_date(self.csv_data["Date Recorded"])
 
     def get_interviewer_location(self):
         """Get location of interviewer for manifest"""
-        return {
-            "label": {"en": ["Location Recorded"]},
-            "value": {"en": [self.csv_data["Location Recorded"].split("\n")[0]]},
-        }
+        return self.plan.metadata_fields["interviewer_location"].extract(self.csv_data)
 
     def get_narrator_location(self):
         """Get location of narrator for manifest"""
-        return {
-            "label": {"en": ["Narrator Location Recorded"]},
-            "value": {"en": [self.csv_data["Narrator Location Recorded"]]},
-        }
+        return self.plan.metadata_fields["narrator_location"].extract(self.csv_data)
 
     def get_aat_format(self):
         """Process AAT Format column to get format for manifest"""
-        return {
-            "label": {"en": ["AAT Format"]},
-            "value": {
-                "en": [
-                    self.csv_data["AAT Format "]
-                    .split("http://vocab.getty.edu/aat/")[0]
-                    .rstrip()
-                ]
-            },
-        }
+        return self.plan.metadata_fields["aat_format"].extract(self.csv_data)
 
     def get_topics(self):
         """Use values in topic fields to get topics to metadata section of a IIIF v3 metadata profile"""
-        topics = [
-            topic
-            for topic in [
-                self.csv_data["LCSH_Topic_1"],
-                self.csv_data["LCSH_Topic_2"],
-                self.csv_data["LCSH_Topic_3"],
-            ]
-            if topic != ""
-        ]
-        return {"label": {"en": ["Topics"]}, "value": {"en": topics}}
+        return self.plan.metadata_fields["topics"].extract(self.csv_data)
 
     def get_places(self):
         """Use values in geographic subject fields to get places to metadata section of a IIIF v3 metadata profile"""
-        places = [
-            place
-            for place in [
-                self.csv_data["LCSH_Geo_1"],
-                self.csv_data["LCSH_Geo_2"],
-            ]
-            if place != ""
-        ]
-        return {"label": {"en": ["Places"]}, "value": {"en": places}}
+        return self.plan.metadata_fields["places"].extract(self.csv_data)
 
     def get_names(self):
         """Use values in name subject fields to get names to metadata section of a IIIF v3 metadata profile"""
-        names = [
-            name
-            for name in [
-                self.csv_data["LCSH_Name_1"],
-                self.csv_data["LCSH_Name_2"],
-            ]
-            if name != ""
+        return self.plan.metadata_fields["names"].extract(self.csv_data)
+
+    def get_duration(self):
+        """Use Interview Stop TC as the length of the manifest's Canvas, in seconds.
+
+        Many rows leave it blank, so the latest question or chapter timecode stands in:
+        the Canvas is then at least as long as every fragment pointing into it.
+        """
+        duration = parse_timecode(self.csv_data["Interview Stop TC"])
+        if duration is not None:
+            return duration
+        timecodes = [
+            self.csv_data[timecode]
+            for _, timecode, _ in self.plan.questions
+            if timecode
         ]
-        return {"label": {"en": ["Subject Names"]}, "value": {"en": names}}
+        for _, timecode in self.plan.chapters:
+            if timecode:
+                timecodes.extend(split_timecode_range(self.csv_data[timecode]))
+        return max(
+            (
+                seconds
+                for seconds in map(parse_timecode, timecodes)
+                if seconds is not None
+            ),
+            default=None,
+        )
 
     def __get_duration_pair(self, next_value):
         if next_value.rstrip() == "":
@@ -145,101 +250,134 @@ class Interview:
         else:
             return next_value
 
+    def get_links(self):
+        """Resolve mapped values to authority URIs for the seeAlso section of the manifest."""
+        links = []
+        seen = set()
+        for field in self.plan.metadata:
+            if field.authority is None:
+                continue
+            for link in field.links(self.csv_data, self.authority):
+                if link["id"] not in seen:
+                    seen.add(link["id"])
+                    links.append(link)
+        return links
+
+    def __build_ranges(self, label, entries):
+        """Build a Range of MediaFragments from (key, label, start, end) tuples.
+
+        A fragment whose start timecode is empty or unreadable is left out with a warning
+        rather than pointed at the wrong time or stretched over the whole canvas.
+        """
+        canvas = canvas_id(self.get_identifier())
+        items = []
+        for key, fragment_label, start, end in entries:
+            fragment = MediaFragment(
+                fragment_label,
+                canvas,
+                start,
+                end,
+                range_id(
+                    self.get_identifier(),
+                    key,
+                    self.id_scheme,
+                    (fragment_label, start, end),
+                ),
+            )
+            if fragment.start is None:
+                logger.warning(
+                    "Skipping %s of %s: %s start timecode %r",
+                    key,
+                    self.get_identifier(),
+                    "unreadable" if start.strip() else "empty",
+                    start,
+                )
+                continue
+            items.append(fragment.build_range())
+        if len(items) == 0:
+            return {}
+        return {
+            "type": "Range",
+            "id": f"http://{range_id(self.get_identifier(), label, self.id_scheme)}",
+            "label": {"en": [label]},
+            "items": items,
+        }
+
     def get_interview_questions(self):
         """Build interview questions from CSV metadata."""
-        canvas_id = (
-            "https://digital.lib.utk.edu/collections/islandora/PID/datastream/PROXY"
-        )
-        keys = [
-            key
-            for key, value in self.csv_data.items()
-            if key.startswith("Interview_Question_") and "TC" not in key
-        ]
         interview_questions = [
             (
+                key,
                 self.csv_data[key],
-                self.csv_data[f"{key}_TC"],
+                self.csv_data[timecode] if timecode else "",
                 self.__get_duration_pair(
-                    self.csv_data[
-                        f"{key.replace(key.split('_')[2],str(int(key.split('_')[2])+1))}_TC"
-                    ]
+                    self.csv_data[next_timecode] if next_timecode else ""
                 ),
             )
-            for key in keys
+            for key, timecode, next_timecode in self.plan.questions
             if self.csv_data[key].rstrip() != ""
         ]
-        if len(interview_questions) > 0:
-            return {
-                "type": "Range",
-                "id": canvas_id,
-                "label": {"en": ["Interview Questions"]},
-                "items": [
-                    MediaFragment(
-                        question[0], canvas_id, question[1], question[2]
-                    ).build_range()
-                    for question in interview_questions
-                ],
-            }
-        else:
-            return {}
+        return self.__build_ranges("Interview Questions", interview_questions)
+
+    def get_chapters(self):
+        """Build chapters from CSV metadata, each timed by a "start - end" range."""
+        chapters = [
+            (
+                key,
+                self.csv_data[key],
+                *split_timecode_range(self.csv_data[timecode] if timecode else ""),
+            )
+            for key, timecode in self.plan.chapters
+            if self.csv_data[key].rstrip() != ""
+        ]
+        return self.__build_ranges("Chapters", chapters)
 
-    # def get_chapters(self):
-    #     """Build chapters from CSV metadata."""
-    #     canvas_id = (
-    #         "https://digital.lib.utk.edu/collections/islandora/PID/datastream/PROXY"
-    #     )
-    #     keys = [
-    #         key
-    #         for key, value in self.csv_data.items()
-    #         if key.startswith("Chapter_") and "TC" not in key
-    #     ]
-    #     chapters = [
-    #         (self.csv_data[key], self.csv_data[f"{key}_TC"])
-    #         for key in keys
-    #         if self.csv_data[key].rstrip() != ""
-    #     ]
-    #     if len(chapters) > 0:
-    #         return {
-    #             "type": "Range",
-    #             "id": canvas_id,
-    #             "label": {"en": ["Chapters"]},
-    #             "items": [
-    #                 MediaFragment(chapter, canvas_id).build_range()
-    #                 for chapter in chapters
-    #             ],
-    #         }
-    #     else:
-    #         return {}
+    __fields = (
+        ("identifier", get_identifier),
+        ("label", get_interview_label),
+        ("rights", get_rights),
+        ("summary", get_summary),
+        ("navDate", get_navigation_date),
+        ("duration", get_duration),
+    )
+    __structures = (
+        ("interview question", get_interview_questions),
+        ("chapters", get_chapters),
+    )
 
     def __generate_interview(self):
-        return {
-            "label": self.get_interview_label(),
-            "rights": self.get_rights(),
-            "summary": self.get_summary(),
-            "narrators": self.get_narrators(),
-            "interviewer": self.get_interviewer(),
-            "navDate": self.get_navigation_date(),
-            "interviewer_location": self.get_interviewer_location(),
-            "narrator_location": self.get_narrator_location(),
-            "aat_format": self.get_aat_format(),
-            "topics": self.get_topics(),
-            "places": self.get_places(),
-            "names": self.get_names(),
-            "interview question": self.get_interview_questions(),
-            # "chapters": self.get_chapters(),
-        }
+        """Run the fixed getters, then every field compiled from mapping.yml."""
+        structures = self.__structures
+        if self.authority is not None:
+            structures += (("links", Interview.get_links),)
+        if instrumentation.timing:
+            return instrumentation.time_fields(
+                self,
+                self.__fields
+                + tuple((field.key, field) for field in self.plan.metadata)
+                + structures,
+            )
+        metadata_v3 = {key: getter(self) for key, getter in self.__fields}
+        for field in self.plan.metadata:
+            metadata_v3[field.key] = field.extract(self.csv_data)
+        for key, getter in structures:
+            metadata_v3[key] = getter(self)
+        return metadata_v3
 
 
 class MediaFragment:
-    def __init__(self, label, canvas_id, start, end):
-        self.range_id = uuid4()
+    __slots__ = ("range_id", "label", "canvas_id", "start", "end")
+
+    def __init__(self, label, canvas_id, start, end, range_id=None):
+        self.range_id = range_id if range_id is not None else uuid4()
         self.label = label
         self.canvas_id = canvas_id
-        print(f"Start: {start}")
-        print(f"End: {end}")
-        print(self.label)
-        self.start = self.__get_duration(start.replace("~", ""))
-        self.end = self.__get_duration(end.replace("~", ""))
+        logger.debug("Start: %s End: %s Label: %s", start, end, label)
+        self.start = parse_timecode(start)
+        self.end = parse_timecode(end)
+        if instrumentation.enabled:
+            instrumentation.counters["ranges built"] += 1
+            instrumentation.counters["timecodes parsed"] += 2
 
     def build_range(self):
         return {
@@ -247,17 +385,13 @@ class MediaFragment:
             "id": f"http://{self.range_id}",
             "label": {"en": [self.label.rstrip()]},
             "items": [
-                {"type": "Canvas", "id": f"{self.canvas_id}#t={self.start},{self.end}"}
+                {
+                    "type": "Canvas",
+                    "id": f"{self.canvas_id}{media_fragment(self.start, self.end)}",
+                }
             ],
         }
 
-    @staticmethod
-    def __get_duration(timestamp):
-        duration_split = timestamp.split(":")
-        hours = int(duration_split[0]) * 60 * 60
-        minutes = int(duration_split[1]) * 60
-        return hours + minutes + int(duration_split[2])
-
 
 if __name__ == "__main__":
     print(MetadataReader("data/metadata.csv").interviews[-2])
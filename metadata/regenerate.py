@@ -0,0 +1,76 @@
+import argparse
+import logging
+import sys
+from transcript.convert import SRTConverter
+from .authority import AuthorityIndex
+from .columns import compile_column_plan
+from .index import CSVIndex
+from .manifest import ManifestWriter
+from .reader import build_interview
+
+logger = logging.getLogger(__name__)
+
+
+def regenerate(
+    identifiers,
+    metadata_file="data/metadata.csv",
+    output_path="data/manifests",
+    srt_path="data/srt_transcripts",
+    vtt_path="data/web_vtt_files/",
+    id_scheme="uuid5",
+    authority=None,
+):
+    """Rebuild the manifests and WebVTT transcripts of a few interviews.
+
+    Rows are read straight from the CSVIndex, so only the requested interviews are
+    parsed, and only SRTs whose names start with a requested id are converted. Returns
+    the manifest paths written, the ids missing from the CSV and the ConversionSummary.
+    """
+    index = CSVIndex(metadata_file)
+    plan = compile_column_plan(tuple(index.header))
+    missing = [identifier for identifier in identifiers if identifier not in index]
+    for identifier in missing:
+        logger.warning("%s is not in %s", identifier, metadata_file)
+    found = [identifier for identifier in identifiers if identifier in index]
+    manifests = ManifestWriter().write_files(
+        (
+            build_interview(
+                index.get_row(identifier), plan, id_scheme, authority=authority
+            )
+            for identifier in found
+        ),
+        output_path,
+    )
+    summary = SRTConverter(srt_path, vtt_path).convert_files_to_vtt(only=found)
+    return manifests, missing, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Regenerate the manifests and transcripts of specific interviews."
+    )
+    parser.add_argument(
+        "identifiers",
+        nargs="+",
+        help="UT Intellectual Unit ids, e.g. 20190920_James_Zachary",
+    )
+    parser.add_argument("--metadata", default="data/metadata.csv")
+    parser.add_argument("--output", default="data/manifests")
+    parser.add_argument("--srt", default="data/srt_transcripts")
+    parser.add_argument("--vtt", default="data/web_vtt_files/")
+    parser.add_argument(
+        "--authority", help="AuthorityIndex database used to add seeAlso links"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    manifests, missing, summary = regenerate(
+        args.identifiers,
+        args.metadata,
+        args.output,
+        args.srt,
+        args.vtt,
+        authority=AuthorityIndex(args.authority) if args.authority else None,
+    )
+    for manifest in manifests:
+        print(manifest)
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+TIMECODE = re.compile(
+    r"^~?\s*(?:(?P<hours>\d+):)?(?P<minutes>\d{1,2}):(?P<seconds>\d{1,2})(?:[.,](?P<fraction>\d+))?$"
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_timecode(timestamp):
+    """Convert a timecode to seconds, or None if it can't be read.
+
+    Accepts H:MM:SS and MM:SS, approximate values marked with ~, and fractional seconds
+    written either as HH:MM:SS.mmm or SRT style HH:MM:SS,mmm. Whole seconds come back as
+    an int so media fragments keep their existing t=20,1086 form. A non-empty value that
+    can't be read is logged as a warning, once per distinct value.
+    """
+    match = TIMECODE.match(timestamp.strip())
+    if match is None:
+        if timestamp.strip():
+            logger.warning("Unreadable timecode %r", timestamp)
+        return None
+    seconds = (
+        int(match["hours"] or 0) * 60 * 60
+        + int(match["minutes"]) * 60
+        + int(match["seconds"])
+    )
+    if match["fraction"] and int(match["fraction"]) != 0:
+        return round(seconds + float(f"0.{match['fraction']}"), 3)
+    return seconds
+
+
+def media_fragment(start, end):
+    """Build a W3C media fragment such as #t=20,1086, leaving out an unknown end.
+
+    Without a start there is no fragment at all: #t=,1086 would mean from zero.
+    """
+    if start is None:
+        return ""
+    return f"#t={start}{'' if end is None else f',{end}'}"
+
+
+def split_timecode_range(value):
+    """Split a "start - end" timecode range into its two halves.
+
+    A single timecode is treated as an open range with an empty end, so both halves can
+    go straight to parse_timecode.
+    """
+    start, _, end = value.partition("-")
+    return start.strip(), end.strip()
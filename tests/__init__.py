@@ -1,2 +1,3 @@
 from . import tests
+
 name = "tests"
@@ -1,6 +1,48 @@
+import copy
+from functools import lru_cache
+import json
+import os
+import pickle
+import pstats
+import random
+import shutil
+import tempfile
 import unittest
-from metadata.reader import Interview
+from benchmarks.import_time import MODULES, measure_import
+from benchmarks.synthetic import HEADER, synthetic_row, write_csv
+from metadata import instrumentation
+from metadata.annotations import AnnotationPageWriter
+from metadata.authority import AuthorityIndex
+from metadata.cache import ManifestCache
+from metadata.columns import compile_column_plan
+from metadata.compact import compact_metadata
+from metadata.dates import normalize_date
+from metadata.files import atomic_write
+from metadata.identifiers import range_id
+from metadata.index import IDENTIFIER, CSVIndex
+from metadata.manifest import ManifestWriter, canvas_id
+from metadata.mapping import MAPPING_FILE, compile_metadata_fields, resolve_columns
+from metadata.pipeline import run_pipeline
+from metadata.reader import Interview, MetadataReader
+from metadata.regenerate import regenerate
 from metadata.sample_interview_data import interview_data
+from metadata.timecode import media_fragment, parse_timecode, split_timecode_range
+from transcript.convert import SRTConverter
+from transcript.srt import MalformedSRTError, convert_srt_to_vtt
+from transcript.vtt import MalformedVTTError, iter_vtt_cues
+
+try:
+    import webvtt
+except ImportError:
+    webvtt = None
+
+SRT_TRANSCRIPTS = "data/srt_transcripts"
+
+
+@lru_cache(maxsize=None)
+def sample_interviews():
+    """Build every sample interview once per test run."""
+    return tuple(Interview(interview) for interview in interview_data)
 
 
 class CheckDescriptiveMetadata(unittest.TestCase):
@@ -22,61 +64,909 @@ class CheckDescriptiveMetadata(unittest.TestCase):
 
 
 class TestDescriptiveMetadata(unittest.TestCase):
+    def check(self, getter):
+        for interview in sample_interviews():
+            CheckDescriptiveMetadata(getattr(interview, getter)()).check_label()
+            CheckDescriptiveMetadata(getattr(interview, getter)()).check_value()
+
     def test_narrator(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(Interview(interview).get_narrators()).check_label()
-            CheckDescriptiveMetadata(Interview(interview).get_narrators()).check_value()
+        self.check("get_narrators")
 
     def test_interviewer(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(
-                Interview(interview).get_interviewer()
-            ).check_label()
-            CheckDescriptiveMetadata(
-                Interview(interview).get_interviewer()
-            ).check_value()
+        self.check("get_interviewer")
 
     def test_interviewer_location(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(
-                Interview(interview).get_interviewer_location()
-            ).check_label()
-            CheckDescriptiveMetadata(
-                Interview(interview).get_interviewer_location()
-            ).check_value()
+        self.check("get_interviewer_location")
 
     def test_narrator_location(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(
-                Interview(interview).get_narrator_location()
-            ).check_label()
-            CheckDescriptiveMetadata(
-                Interview(interview).get_narrator_location()
-            ).check_value()
+        self.check("get_narrator_location")
 
     def test_aat_format(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(
-                Interview(interview).get_aat_format()
-            ).check_label()
-            CheckDescriptiveMetadata(
-                Interview(interview).get_aat_format()
-            ).check_value()
+        self.check("get_aat_format")
 
     def test_topics(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(Interview(interview).get_topics()).check_label()
-            CheckDescriptiveMetadata(Interview(interview).get_topics()).check_value()
+        self.check("get_topics")
 
     def test_places(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(Interview(interview).get_places()).check_label()
-            CheckDescriptiveMetadata(Interview(interview).get_places()).check_value()
+        self.check("get_places")
 
     def test_names(self):
-        for interview in interview_data:
-            CheckDescriptiveMetadata(Interview(interview).get_names()).check_label()
-            CheckDescriptiveMetadata(Interview(interview).get_names()).check_value()
+        self.check("get_names")
+
+
+class TestSyntheticInterviews(unittest.TestCase):
+    """Properties that must hold for any row shaped like the metadata export."""
+
+    runs = 200
+
+    def rows(self):
+        generator = random.Random(20200313)
+        for index in range(self.runs):
+            questions = generator.randint(0, 72)
+            row = synthetic_row(generator, index, questions, generator.randint(0, 10))
+            for number in range(1, questions + 1):
+                if generator.random() < 0.1:
+                    row[f"Interview_Question_{number}"] = " "
+                if generator.random() < 0.1:
+                    row[f"Interview_Question_{number}_TC"] = (
+                        f"~{row[f'Interview_Question_{number}_TC']}"
+                    )
+            if generator.random() < 0.1:
+                row["Interview Stop TC"] = ""
+            yield row
+
+    def test_one_range_per_filled_question(self):
+        for row in self.rows():
+            filled = sum(
+                1
+                for key, _, _ in compile_column_plan(tuple(row)).questions
+                if row[key].strip()
+            )
+            ranges = Interview(row).metadata_v3["interview question"]
+            self.assertEqual(len(ranges.get("items", [])), filled)
+
+    def test_ranges_move_forward(self):
+        for row in self.rows():
+            ranges = Interview(row).metadata_v3["interview question"]
+            for question in ranges.get("items", []):
+                fragment = question["items"][0]["id"].split("#t=")[1]
+                start, _, end = fragment.partition(",")
+                if end:
+                    self.assertLess(float(start), float(end))
+
+    def test_navigation_date(self):
+        for row in self.rows():
+            month, day, year = row["Date Recorded"].split("/")
+            self.assertEqual(
+                Interview(row).get_navigation_date(),
+                f"{year}-{int(month):02d}-{int(day):02d}T00:00:00Z",
+            )
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.metadata_file = write_csv(os.path.join(self.directory, "metadata.csv"), 40)
+
+    def test_process_pool_matches_serial_build(self):
+        reader = MetadataReader(self.metadata_file, workers=2, chunksize=4)
+        self.assertEqual(
+            list(reader.iter_interviews()),
+            list(MetadataReader(self.metadata_file).iter_interviews()),
+        )
+
+
+class TestColumnPlan(unittest.TestCase):
+    def test_questions(self):
+        plan = compile_column_plan(tuple(interview_data[0]))
+        self.assertEqual(
+            plan.questions[0],
+            (
+                "Interview_Question_1",
+                "Interview_Question_1_TC",
+                "Interview_Question_2_TC",
+            ),
+        )
+        last_question, _, next_timecode = plan.questions[-1]
+        self.assertEqual(last_question, "Interview_Question_72")
+        self.assertIsNone(next_timecode)
+
+    def test_chapters(self):
+        plan = compile_column_plan(tuple(interview_data[0]))
+        self.assertEqual(plan.chapters[0], ("Chapter_1", "Chapter_1_TC"))
+        self.assertEqual(plan.chapters[-1], ("Chapter_11", None))
+
+    def test_plan_pickles_by_header(self):
+        plan = compile_column_plan(tuple(interview_data[0]))
+        self.assertIs(pickle.loads(pickle.dumps(plan)), plan)
+
+    def test_plan_is_shared(self):
+        self.assertIs(
+            compile_column_plan(tuple(interview_data[0])),
+            compile_column_plan(tuple(interview_data[1])),
+        )
+
+
+class TestMapping(unittest.TestCase):
+    def test_resolve_numbered_columns(self):
+        header = ("Narrator Name 2", "Narrator Name", "Title", "Narrator Name 10")
+        self.assertEqual(
+            resolve_columns("[Narrator Name #]", header),
+            ("Narrator Name", "Narrator Name 2", "Narrator Name 10"),
+        )
+        self.assertEqual(resolve_columns("[Title]", header), ("Title",))
+        self.assertEqual(resolve_columns("[Missing]", header), ())
+
+    def test_fields_match_getters(self):
+        interview = sample_interviews()[0]
+        fields = compile_metadata_fields(tuple(interview_data[0]))
+        self.assertEqual(fields[0].key, "narrators")
+        self.assertEqual(
+            fields[0].extract(interview_data[0]), interview.get_narrators()
+        )
+        for field in fields:
+            self.assertEqual(
+                field.extract(interview_data[0]), interview.metadata_v3[field.key]
+            )
+
+
+class TestChapters(unittest.TestCase):
+    def test_chapter_ranges(self):
+        chapters = sample_interviews()[7].metadata_v3["chapters"]
+        self.assertEqual(chapters["label"], {"en": ["Chapters"]})
+        self.assertEqual(chapters["items"][0]["label"], {"en": ["CUT"]})
+        self.assertTrue(chapters["items"][0]["items"][0]["id"].endswith("#t=198,206"))
+
+    def test_no_chapters(self):
+        self.assertEqual(sample_interviews()[0].metadata_v3["chapters"], {})
+
+    def test_structure_ids_are_unique(self):
+        manifest = ManifestWriter().manifest(sample_interviews()[7].metadata_v3)
+        ids = [structure["id"] for structure in manifest["structures"]]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertNotIn(
+            canvas_id(sample_interviews()[7].metadata_v3["identifier"]), ids
+        )
+
+    def test_chapters_in_structures(self):
+        manifest = ManifestWriter().manifest(sample_interviews()[7].metadata_v3)
+        self.assertEqual(
+            [structure["label"]["en"][0] for structure in manifest["structures"]],
+            ["Interview Questions", "Chapters"],
+        )
+
+
+class TestAuthorityIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        subjects = os.path.join(self.directory, "lcsh.nt")
+        with open(subjects, "w", encoding="utf-8") as dump:
+            dump.write(
+                "<http://id.loc.gov/authorities/subjects/sh2010009280> "
+                "<http://www.loc.gov/mads/rdf/v1#authoritativeLabel> "
+                '"Social media"@en .\n'
+                "<http://id.loc.gov/authorities/subjects/sh2010009280> "
+                "<http://www.w3.org/2004/02/skos/core#prefLabel> "
+                '"M\u00e9dias sociaux"@fr .\n'
+            )
+        places = os.path.join(self.directory, "places.tsv")
+        with open(places, "w", encoding="utf-8") as dump:
+            dump.write(
+                "Sevierville (Tenn.)\thttp://id.loc.gov/authorities/names/n79066245\n"
+            )
+        geonames = os.path.join(self.directory, "geonames.txt")
+        with open(geonames, "w", encoding="utf-8") as dump:
+            dump.write("4633419\tGatlinburg\tGatlinburg\n")
+        self.index = AuthorityIndex.build(
+            os.path.join(self.directory, "authority.db"),
+            [
+                ("lcsh", subjects, "nt"),
+                ("lcsh", places, "tsv"),
+                ("geonames", geonames, "geonames"),
+            ],
+        )
+        self.addCleanup(self.index.close)
+
+    def test_resolve(self):
+        self.assertEqual(
+            self.index.resolve("lcsh", "Social media"),
+            "http://id.loc.gov/authorities/subjects/sh2010009280",
+        )
+        self.assertEqual(
+            self.index.resolve("geonames", "Gatlinburg"),
+            "https://sws.geonames.org/4633419/",
+        )
+        self.assertIsNone(self.index.resolve("lcsh", "M\u00e9dias sociaux"))
+        self.assertIsNone(self.index.resolve("aat", "Social media"))
+
+    def test_links(self):
+        metadata_v3 = Interview(interview_data[0], authority=self.index).metadata_v3
+        self.assertEqual(
+            [link["id"] for link in metadata_v3["links"]],
+            [
+                "http://vocab.getty.edu/aat/300136900",
+                "http://id.loc.gov/authorities/subjects/sh2010009280",
+                "http://id.loc.gov/authorities/names/n79066245",
+            ],
+        )
+        self.assertEqual(
+            metadata_v3["links"][0]["label"], {"en": ["motion pictures (visual works)"]}
+        )
+        manifest = ManifestWriter().manifest(metadata_v3)
+        self.assertEqual(manifest["seeAlso"], metadata_v3["links"])
+
+    def test_links_are_opt_in(self):
+        self.assertNotIn("links", sample_interviews()[0].metadata_v3)
+
+    def test_pickles_by_path(self):
+        self.index.resolve("lcsh", "Social media")
+        copy = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(copy.signature, self.index.signature)
+        self.assertEqual(
+            copy.resolve("geonames", "Gatlinburg"), "https://sws.geonames.org/4633419/"
+        )
+        copy.close()
+
+
+class TestManifestCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.metadata_file = write_csv(os.path.join(self.directory, "metadata.csv"), 4)
+        self.cache_path = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_cached_manifests_match(self):
+        cache = ManifestCache(self.cache_path)
+        first = list(MetadataReader(self.metadata_file, cache=cache).iter_interviews())
+        instrumentation.enable()
+        second = list(MetadataReader(self.metadata_file, cache=cache).iter_interviews())
+        self.assertEqual(first, second)
+        self.assertEqual(instrumentation.snapshot()["cache hits"], 4)
+        self.assertNotIn("interviews built", instrumentation.snapshot())
+
+    def test_key_follows_mapping(self):
+        mapping = os.path.join(self.directory, "mapping.yml")
+        with open(MAPPING_FILE) as original, open(mapping, "w") as copy:
+            copy.write(original.read().replace('"Narrators"', '"Narrator"'))
+        row = {"Title": "same row"}
+        self.assertNotEqual(
+            ManifestCache(self.cache_path).key(row),
+            ManifestCache(self.cache_path, mapping=mapping).key(row),
+        )
+
+    def test_failed_put_leaves_nothing(self):
+        cache = ManifestCache(self.cache_path)
+        key = cache.key({"Title": "unserializable"})
+        with self.assertRaises(TypeError):
+            cache.put(key, {"label": object()})
+        self.assertIsNone(cache.get(key))
+        for path, directories, files in os.walk(self.cache_path):
+            self.assertEqual(files, [])
+
+    def test_garbage_collection(self):
+        stale = ManifestCache(self.cache_path, version="0")
+        stale.put(stale.key({"Title": "stale"}), {})
+        os.makedirs(os.path.join(self.cache_path, "important_data"))
+        cache = ManifestCache(self.cache_path, max_bytes=0)
+        list(MetadataReader(self.metadata_file, cache=cache).iter_interviews())
+        self.assertEqual(
+            sorted(os.listdir(self.cache_path)), ["important_data", f"v{cache.version}"]
+        )
+        for path, directories, files in os.walk(self.cache_path):
+            self.assertEqual(files, [])
+
+
+class TestCompactInterview(unittest.TestCase):
+    def test_only_mapped_columns_are_kept(self):
+        interview = sample_interviews()[0]
+        self.assertFalse(hasattr(interview, "__dict__"))
+        self.assertNotIn("Narrator Class 1", interview.csv_data)
+        self.assertIn("Interview_Question_1_TC", interview.csv_data)
+
+    def test_release_row(self):
+        interview = Interview(interview_data[0], retain_row=False)
+        self.assertIsNone(interview.csv_data)
+        self.assertEqual(interview.metadata_v3, sample_interviews()[0].metadata_v3)
+
+
+class TestCompactMetadata(unittest.TestCase):
+    def test_serialization_is_unchanged(self):
+        for interview in sample_interviews():
+            self.assertEqual(
+                json.dumps(compact_metadata(copy.deepcopy(interview.metadata_v3))),
+                json.dumps(interview.metadata_v3),
+            )
+
+    def test_labels_and_values_are_shared(self):
+        first, second = (
+            compact_metadata(Interview(interview).metadata_v3)
+            for interview in interview_data[:2]
+        )
+        self.assertIs(first["narrators"]["label"], second["narrators"]["label"])
+        self.assertIs(first["aat_format"], second["aat_format"])
+        self.assertIs(first["rights"], second["rights"])
+
+    def test_compact_reader(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        metadata_file = write_csv(os.path.join(directory, "metadata.csv"), 8)
+        self.assertEqual(
+            MetadataReader(metadata_file, compact=True).interviews,
+            MetadataReader(metadata_file).interviews,
+        )
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "document.json")
+        with open(self.path, "w") as document:
+            document.write("old")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path) as document:
+            return document.read()
+
+    def test_replaces_on_success(self):
+        with atomic_write(self.path) as temporary, open(temporary, "w") as document:
+            document.write("new")
+        self.assertEqual(self.read(), "new")
+        self.assertEqual(os.listdir(self.directory), ["document.json"])
+
+    def test_keeps_original_on_failure(self):
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as temporary, open(temporary, "w") as document:
+                document.write("partial")
+                raise RuntimeError
+        self.assertEqual(self.read(), "old")
+        self.assertEqual(os.listdir(self.directory), ["document.json"])
+
+
+class TestCSVIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.metadata_file = write_csv(os.path.join(self.directory, "metadata.csv"), 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_rows_match_metadata_reader(self):
+        index = CSVIndex(self.metadata_file)
+        rows = list(MetadataReader(self.metadata_file).iter_rows())
+        self.assertEqual(len(index), len(rows))
+        for row in reversed(rows):
+            self.assertEqual(index.get_row(row[IDENTIFIER]), row)
+        self.assertIsNone(index.get_row("19000101_Nobody_Nobody"))
+
+    def test_index_is_persisted_and_refreshed(self):
+        CSVIndex(self.metadata_file)
+        self.assertTrue(os.path.exists(f"{self.metadata_file}.idx.json"))
+        write_csv(self.metadata_file, 3, seed=1)
+        self.assertEqual(len(CSVIndex(self.metadata_file)), 3)
+
+    def test_missing_identifier_column(self):
+        metadata_file = os.path.join(self.directory, "other.csv")
+        with open(metadata_file, "w") as my_csv:
+            my_csv.write("Title|Abstract\nA title|An abstract\n")
+        with self.assertRaises(ValueError):
+            CSVIndex(metadata_file)
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.metadata_file = write_csv(os.path.join(self.directory, "metadata.csv"), 30)
+        self.output_path = os.path.join(self.directory, "manifests")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_pipeline_matches_serial_build(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stats = run_pipeline(
+                self.metadata_file,
+                self.output_path,
+                executor,
+                builders=2,
+                rows_queue=4,
+                manifests_queue=4,
+            )
+        self.assertEqual(stats.rows_read, 30)
+        self.assertEqual(stats.manifests_written, 30)
+        self.assertLessEqual(stats.queues["rows"].max_depth, 4)
+        self.assertLessEqual(stats.queues["manifests"].max_depth, 4)
+        writer = ManifestWriter()
+        for metadata_v3 in MetadataReader(self.metadata_file).iter_interviews():
+            with open(
+                os.path.join(self.output_path, f"{metadata_v3['identifier']}.json")
+            ) as manifest:
+                self.assertEqual(json.load(manifest), writer.manifest(metadata_v3))
+
+    def test_writer_failure_stops_the_pipeline(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        class FailingWriter(ManifestWriter):
+            def write_file(self, metadata_v3, directory, indent=2):
+                raise OSError("disk full")
+
+        metadata_file = write_csv(os.path.join(self.directory, "large.csv"), 200)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with self.assertRaises(OSError):
+                run_pipeline(
+                    metadata_file,
+                    self.output_path,
+                    executor,
+                    builders=2,
+                    rows_queue=4,
+                    manifests_queue=4,
+                    writer=FailingWriter(),
+                )
+
+
+class TestRegenerate(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.metadata_file = write_csv(os.path.join(self.directory, "metadata.csv"), 10)
+        self.identifiers = [
+            row[IDENTIFIER] for row in MetadataReader(self.metadata_file).iter_rows()
+        ]
+        self.srt_path = os.path.join(self.directory, "srt")
+        os.makedirs(self.srt_path)
+        transcript = os.path.join(SRT_TRANSCRIPTS, os.listdir(SRT_TRANSCRIPTS)[0])
+        for identifier in self.identifiers[:2]:
+            shutil.copy(transcript, os.path.join(self.srt_path, f"{identifier}.srt"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_only_requested_interviews(self):
+        manifests, missing, summary = regenerate(
+            [self.identifiers[1], "19000101_Nobody_Nobody"],
+            self.metadata_file,
+            os.path.join(self.directory, "manifests"),
+            self.srt_path,
+            os.path.join(self.directory, "vtt"),
+        )
+        self.assertEqual(
+            [os.path.basename(manifest) for manifest in manifests],
+            [f"{self.identifiers[1]}.json"],
+        )
+        self.assertEqual(missing, ["19000101_Nobody_Nobody"])
+        self.assertEqual(
+            [os.path.basename(vtt) for vtt in summary.converted],
+            [f"{self.identifiers[1]}.vtt"],
+        )
+
+
+class TestRangeIds(unittest.TestCase):
+    def test_ranges_are_deterministic(self):
+        self.assertEqual(
+            Interview(interview_data[0]).metadata_v3,
+            sample_interviews()[0].metadata_v3,
+        )
+
+    def test_content_ids_follow_content(self):
+        self.assertEqual(
+            range_id(
+                "20190920_James_Zachary",
+                "Interview_Question_1",
+                "content",
+                ("Q", "0:00:20"),
+            ),
+            range_id(
+                "20190920_James_Zachary",
+                "Interview_Question_1",
+                "content",
+                ("Q", "0:00:20"),
+            ),
+        )
+        self.assertNotEqual(
+            range_id(
+                "20190920_James_Zachary",
+                "Interview_Question_1",
+                "content",
+                ("Q", "0:00:20"),
+            ),
+            range_id(
+                "20190920_James_Zachary",
+                "Interview_Question_1",
+                "content",
+                ("Q", "0:00:21"),
+            ),
+        )
+
+    def test_content_ids_are_name_based(self):
+        self.assertEqual(
+            range_id("20190920_James_Zachary", "Chapter_1", "content", ("C",)).version,
+            5,
+        )
+
+    def test_random_ids(self):
+        first, second = (
+            Interview(interview_data[0], id_scheme="uuid4").metadata_v3
+            for _ in range(2)
+        )
+        self.assertNotEqual(first, second)
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            range_id("20190920_James_Zachary", "Interview_Question_1", "serial")
+
+
+class TestManifestWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.interviews = [
+            interview.metadata_v3 for interview in sample_interviews()[:3]
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_manifest(self):
+        manifest = ManifestWriter("https://example.org/").manifest(self.interviews[0])
+        self.assertEqual(list(manifest)[:3], ["@context", "id", "type"])
+        self.assertEqual(
+            manifest["id"],
+            f"https://example.org/{self.interviews[0]['identifier']}.json",
+        )
+        self.assertEqual(manifest["structures"][0]["type"], "Range")
+
+    def test_canvas(self):
+        manifest = ManifestWriter().manifest(self.interviews[0])
+        canvas_ids = [canvas["id"] for canvas in manifest["items"]]
+        self.assertEqual(canvas_ids, [canvas_id(self.interviews[0]["identifier"])])
+        self.assertEqual(manifest["items"][0]["type"], "Canvas")
+        self.assertEqual(manifest["items"][0]["duration"], 18 * 60 + 6)
+        for structure in manifest["structures"]:
+            for item in structure["items"]:
+                self.assertEqual(item["items"][0]["id"].split("#")[0], canvas_ids[0])
+
+    def test_duration_without_stop_timecode(self):
+        row = dict(interview_data[0])
+        row["Interview Stop TC"] = ""
+        self.assertEqual(Interview(row).metadata_v3["duration"], 16 * 60 + 38)
+
+    def test_write_files(self):
+        paths = ManifestWriter().write_files(iter(self.interviews), self.directory)
+        self.assertEqual(
+            sorted(os.listdir(self.directory)), sorted(map(os.path.basename, paths))
+        )
+        with open(paths[0]) as manifest:
+            self.assertEqual(json.load(manifest)["type"], "Manifest")
+
+    def test_write_ndjson(self):
+        path = os.path.join(self.directory, "manifests.ndjson")
+        self.assertEqual(ManifestWriter().write_ndjson(iter(self.interviews), path), 3)
+        with open(path) as ndjson:
+            manifests = [json.loads(line) for line in ndjson]
+        self.assertEqual(
+            [manifest["label"] for manifest in manifests],
+            [interview["label"]["label"] for interview in self.interviews],
+        )
+        self.assertEqual(os.listdir(self.directory), ["manifests.ndjson"])
+
+    def test_rows_without_identifier_are_skipped(self):
+        unnamed = dict(self.interviews[0], identifier="")
+        with self.assertLogs("metadata.manifest", "WARNING"):
+            paths = ManifestWriter().write_files(
+                [unnamed, self.interviews[1]], self.directory
+            )
+        self.assertEqual(len(paths), 1)
+        self.assertNotIn(".json", os.listdir(self.directory))
+
+
+class TestTimecode(unittest.TestCase):
+    def test_parse_timecode(self):
+        self.assertEqual(parse_timecode("0:18:06"), 1086)
+        self.assertEqual(parse_timecode("~00:05:10"), 310)
+        self.assertEqual(parse_timecode("00:00:19,150"), 19.15)
+        self.assertEqual(parse_timecode("00:00:19.500"), 19.5)
+        self.assertEqual(parse_timecode("05:10"), 310)
+
+    def test_unreadable_timecode(self):
+        for timestamp in ("", "00:", "00:00:25:50"):
+            self.assertIsNone(parse_timecode(timestamp))
+
+    def test_unreadable_timecode_warns(self):
+        parse_timecode.cache_clear()
+        with self.assertLogs("metadata.timecode", "WARNING") as logs:
+            self.assertIsNone(parse_timecode("00:00:05:16"))
+        self.assertIn("'00:00:05:16'", logs.output[0])
+
+    def test_range_without_start_is_skipped(self):
+        row = dict(interview_data[0])
+        row["Interview_Question_1_TC"] = "00:"
+        with self.assertLogs("metadata.reader", "WARNING"):
+            ranges = Interview(row).metadata_v3["interview question"]["items"]
+        expected = sample_interviews()[0].metadata_v3["interview question"]["items"]
+        self.assertEqual(ranges, expected[1:])
+
+    def test_range_with_empty_start_is_skipped(self):
+        row = dict(interview_data[0])
+        row["Interview_Question_1_TC"] = ""
+        with self.assertLogs("metadata.reader", "WARNING") as logs:
+            ranges = Interview(row).metadata_v3["interview question"]["items"]
+        self.assertIn("empty start timecode", logs.output[0])
+        expected = sample_interviews()[0].metadata_v3["interview question"]["items"]
+        self.assertEqual(ranges, expected[1:])
+
+    def test_media_fragment(self):
+        self.assertEqual(media_fragment(20, 1086), "#t=20,1086")
+        self.assertEqual(media_fragment(20, None), "#t=20")
+        self.assertEqual(media_fragment(None, 1086), "")
+        self.assertEqual(media_fragment(None, None), "")
+
+    def test_split_timecode_range(self):
+        self.assertEqual(
+            split_timecode_range("00:03:18 - 00:03:26"), ("00:03:18", "00:03:26")
+        )
+        self.assertEqual(split_timecode_range("0:19:20"), ("0:19:20", ""))
+        self.assertEqual(split_timecode_range(""), ("", ""))
+
+
+class TestDates(unittest.TestCase):
+    def test_short_date(self):
+        self.assertEqual(normalize_date("9/20/2019"), "2019-09-20T00:00:00Z")
+        self.assertEqual(normalize_date("10/13/2019"), "2019-10-13T00:00:00Z")
+
+    def test_uncertain_date(self):
+        self.assertEqual(normalize_date("01/27/2017 (?)"), "2017-01-27T00:00:00Z")
+
+    def test_unreadable_date(self):
+        for value in (
+            "",
+            "2019-09-20",
+            "2/30/2020",
+            "13/1/2020",
+            "2/30/2017 (?)",
+            "2/30/2017 circa",
+        ):
+            self.assertEqual(normalize_date(value), "")
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_synthetic_csv_matches_export_shape(self):
+        with tempfile.TemporaryDirectory() as directory:
+            reader = MetadataReader(
+                write_csv(os.path.join(directory, "metadata.csv"), 5, questions=72)
+            )
+            self.assertEqual(reader.column_plan.header, tuple(HEADER))
+            self.assertEqual(reader.column_plan.header, tuple(interview_data[0]))
+            for interview in reader.iter_interviews():
+                self.assertEqual(len(interview["interview question"]["items"]), 72)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_heavy_dependencies_load_lazily(self):
+        for module in MODULES:
+            _, loaded = measure_import(module)
+            self.assertEqual(loaded, [], module)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_by_default(self):
+        Interview(interview_data[0])
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_timecodes_counted_with_a_warm_cache(self):
+        sample_interviews()
+        instrumentation.enable()
+        Interview(interview_data[0])
+        counters = instrumentation.snapshot()
+        self.assertGreater(counters["ranges built"], 0)
+        self.assertEqual(counters["timecodes parsed"], 2 * counters["ranges built"])
+
+    def test_getter_timings(self):
+        instrumentation.enable_timing()
+        try:
+            Interview(interview_data[0])
+            Interview(interview_data[1])
+        finally:
+            instrumentation.disable_timing()
+        report = instrumentation.timing_report()
+        self.assertEqual(report[instrumentation.ROW]["count"], 2)
+        self.assertEqual(report["Interview.get_navigation_date"]["count"], 2)
+        with tempfile.TemporaryDirectory() as directory:
+            instrumentation.export_json(os.path.join(directory, "timings.json"))
+            instrumentation.export_pstats(os.path.join(directory, "timings.prof"))
+            stats = pstats.Stats(os.path.join(directory, "timings.prof"))
+        self.assertIn(
+            "Interview.get_interview_questions",
+            [function for _, _, function in stats.stats],
+        )
+
+    def test_counts_ranges(self):
+        instrumentation.enable()
+        interview = Interview(interview_data[0])
+        counters = instrumentation.snapshot()
+        self.assertEqual(counters["interviews built"], 1)
+        self.assertEqual(
+            counters["ranges built"],
+            len(interview.metadata_v3["interview question"]["items"]),
+        )
+
+
+class TestSRTConverter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.srt_path = os.path.join(self.directory, "srt")
+        self.vtt_path = os.path.join(self.directory, "vtt")
+        shutil.copytree(SRT_TRANSCRIPTS, self.srt_path)
+        with open(os.path.join(self.srt_path, "malformed.srt"), "w") as srt:
+            srt.write("not a transcript\n")
+        with open(os.path.join(self.srt_path, "notes.txt"), "w") as notes:
+            notes.write("not a transcript either\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_malformed_file_does_not_stop_batch(self):
+        summary = SRTConverter(self.srt_path, self.vtt_path).convert_files_to_vtt(
+            workers=2
+        )
+        self.assertEqual(len(summary.converted), len(os.listdir(SRT_TRANSCRIPTS)))
+        self.assertEqual(len(summary.skipped), 1)
+        self.assertIn(os.path.join(self.srt_path, "malformed.srt"), summary.failed)
+        for vtt in summary.converted:
+            self.assertTrue(os.path.exists(vtt))
+
+    def test_incremental_skips_unchanged_files(self):
+        converter = SRTConverter(self.srt_path, self.vtt_path)
+        first = converter.convert_files_to_vtt(incremental=True)
+        second = converter.convert_files_to_vtt(incremental=True)
+        self.assertEqual(second.converted, [])
+        self.assertEqual(len(second.up_to_date), len(first.converted))
+        source = os.path.join(self.srt_path, os.listdir(SRT_TRANSCRIPTS)[0])
+        with open(source, "a") as srt:
+            srt.write("\n")
+        third = converter.convert_files_to_vtt(incremental=True)
+        self.assertEqual(len(third.converted), 1)
+
+
+class TestSRTParser(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @unittest.skipIf(webvtt is None, "webvtt-py is not installed")
+    def test_matches_webvtt(self):
+        for file in os.listdir(SRT_TRANSCRIPTS):
+            native = os.path.join(self.directory, "native.vtt")
+            reference = os.path.join(self.directory, "reference.vtt")
+            convert_srt_to_vtt(os.path.join(SRT_TRANSCRIPTS, file), native)
+            webvtt.from_srt(os.path.join(SRT_TRANSCRIPTS, file)).save(reference)
+            with open(native) as native_vtt, open(reference) as reference_vtt:
+                self.assertEqual(
+                    native_vtt.read().rstrip("\n"), reference_vtt.read().rstrip("\n")
+                )
+
+    def test_malformed_file_leaves_no_output(self):
+        source = os.path.join(self.directory, "malformed.srt")
+        destination = os.path.join(self.directory, "malformed.vtt")
+        with open(source, "w") as srt:
+            srt.write("not a transcript\n")
+        with self.assertRaises(MalformedSRTError):
+            convert_srt_to_vtt(source, destination)
+        self.assertEqual(os.listdir(self.directory), ["malformed.srt"])
+
+
+class TestVTTParser(unittest.TestCase):
+    def test_cues(self):
+        cues = list(
+            iter_vtt_cues(
+                [
+                    "WEBVTT\n",
+                    "\n",
+                    "NOTE a comment\n",
+                    "\n",
+                    "intro\n",
+                    "00:00:01.000 --> 00:00:04.500 align:start\n",
+                    "Hello\n",
+                    "there\n",
+                    "\n",
+                    "01:05.250 --> 01:07.000\n",
+                    "Again\n",
+                ]
+            )
+        )
+        self.assertEqual(
+            [(cue.start, cue.end, cue.lines) for cue in cues],
+            [
+                ("00:00:01.000", "00:00:04.500", ["Hello", "there"]),
+                ("01:05.250", "01:07.000", ["Again"]),
+            ],
+        )
+
+    def test_missing_header(self):
+        with self.assertRaises(MalformedVTTError):
+            list(iter_vtt_cues(["00:00:01.000 --> 00:00:04.500\n", "Hello\n"]))
+
+
+class TestAnnotationPages(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.vtt = os.path.join(self.directory, "transcript.vtt")
+        source = os.path.join(SRT_TRANSCRIPTS, sorted(os.listdir(SRT_TRANSCRIPTS))[0])
+        convert_srt_to_vtt(source, self.vtt)
+        with open(self.vtt) as vtt:
+            self.cues = list(iter_vtt_cues(vtt))
+
+    def load(self, name):
+        with open(os.path.join(self.directory, "annotations", name)) as document:
+            return json.load(document)
+
+    def test_pages(self):
+        writer = AnnotationPageWriter(page_size=50)
+        references = writer.write_file(
+            self.vtt, "20200313_Schwartz", os.path.join(self.directory, "annotations")
+        )
+        collection = self.load(writer.collection_name("20200313_Schwartz"))
+        pages = -(-len(self.cues) // 50)
+        self.assertEqual(len(references), pages)
+        self.assertEqual(collection["total"], len(self.cues))
+        self.assertEqual(collection["last"]["id"], references[-1]["id"])
+        annotations = []
+        for number in range(1, pages + 1):
+            page = self.load(writer.page_name("20200313_Schwartz", number))
+            self.assertEqual(page["id"], references[number - 1]["id"])
+            self.assertEqual(page["startIndex"], len(annotations))
+            self.assertEqual("next" in page, number < pages)
+            annotations.extend(page["items"])
+        self.assertEqual(len(annotations), len(self.cues))
+        first = annotations[0]
+        self.assertEqual(first["motivation"], "supplementing")
+        self.assertEqual(first["body"]["value"], "\n".join(self.cues[0].lines))
+        self.assertEqual(
+            first["target"],
+            canvas_id("20200313_Schwartz")
+            + media_fragment(
+                parse_timecode(self.cues[0].start), parse_timecode(self.cues[0].end)
+            ),
+        )
+
+    def test_manifest_links_its_transcript(self):
+        metadata_v3 = sample_interviews()[0].metadata_v3
+        identifier = metadata_v3["identifier"]
+        vtt_path = os.path.join(self.directory, "vtt")
+        os.makedirs(vtt_path)
+        shutil.copy(self.vtt, os.path.join(vtt_path, f"{identifier}_corrected.vtt"))
+        shutil.copy(self.vtt, os.path.join(vtt_path, "19000101_Nobody_Nobody.vtt"))
+        output_path = os.path.join(self.directory, "annotations")
+        with self.assertLogs("metadata.annotations", "WARNING"):
+            annotations = AnnotationPageWriter(page_size=200).write_files(
+                vtt_path, [identifier, "20190920_Other_Person"], output_path
+            )
+        self.assertEqual(list(annotations), [identifier])
+        writer = ManifestWriter(annotations=annotations)
+        manifest = writer.manifest(metadata_v3)
+        canvas = manifest["items"][0]
+        self.assertEqual(canvas["annotations"], annotations[identifier])
+        for reference in canvas["annotations"]:
+            page = self.load(reference["id"].rsplit("/", 1)[1])
+            self.assertEqual(page["id"], reference["id"])
+            self.assertEqual(
+                page["partOf"][0]["id"],
+                manifest["id"].replace(".json", "-annotations.json"),
+            )
 
 
 if __name__ == "__main__":
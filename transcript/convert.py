@@ -1,5 +1,35 @@
-import webvtt
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
+import time
+from .srt import convert_srt_to_vtt
+from .state import ConversionState
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionSummary:
+    """Files converted, skipped and failed by one SRTConverter run."""
+
+    def __init__(self):
+        self.converted = []
+        self.skipped = []
+        self.up_to_date = []
+        self.failed = {}
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self):
+        """Throughput over the files that were actually converted."""
+        return len(self.converted) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{len(self.converted)} converted, {len(self.up_to_date)} up to date, "
+            f"{len(self.skipped)} skipped, "
+            f"{len(self.failed)} failed in {self.elapsed:.2f}s "
+            f"({self.files_per_second:.1f} files/s)"
+        )
 
 
 class SRTConverter:
@@ -14,13 +44,72 @@ class SRTConverter:
             os.makedirs(output_path)
         return
 
-    def convert_files_to_vtt(self):
+    def __find_jobs(self, summary, state, only):
+        jobs = []
         for path, directories, files in os.walk(self.srt_path):
-            for file in files:
-                webvtt.from_srt(f"{path}/{file}").save(
-                    f"{self.vtt_path}{file.replace('srt', 'vtt')}"
+            for file in sorted(files):
+                if only is not None and not file.startswith(only):
+                    continue
+                source = os.path.join(path, file)
+                destination = os.path.join(
+                    self.vtt_path, f"{os.path.splitext(file)[0]}.vtt"
                 )
+                if not file.lower().endswith(".srt"):
+                    summary.skipped.append(source)
+                elif state is not None and state.is_current(source, destination):
+                    summary.up_to_date.append(source)
+                else:
+                    jobs.append((source, destination))
+        return jobs
+
+    def convert_files_to_vtt(
+        self, workers=1, use_processes=False, incremental=False, only=None
+    ):
+        """Convert every SRT under srt_path to WebVTT in vtt_path.
+
+        Files are converted concurrently by a pool of threads, or processes when
+        use_processes is set. A file that fails to convert is recorded in the summary
+        without stopping the rest of the batch. In incremental mode, SRTs whose VTT is
+        up to date according to the ConversionState in vtt_path are left alone. Passing
+        intellectual unit ids as only limits the run to files whose names start with one.
+        """
+        started = time.perf_counter()
+        summary = ConversionSummary()
+        state = ConversionState(self.vtt_path) if incremental else None
+        jobs = self.__find_jobs(summary, state, None if only is None else tuple(only))
+        if use_processes:
+            from concurrent.futures import ProcessPoolExecutor as executor_class
+        else:
+            executor_class = ThreadPoolExecutor
+        sources = [source for source, destination in jobs]
+        destinations = [destination for source, destination in jobs]
+        with executor_class(max_workers=workers) as executor:
+            for source, destination, error in zip(
+                sources, destinations, executor.map(convert_file, sources, destinations)
+            ):
+                if error is None:
+                    summary.converted.append(destination)
+                    if state is not None:
+                        state.record(source)
+                else:
+                    summary.failed[source] = error
+                    logger.warning("Could not convert %s: %s", source, error)
+        if state is not None:
+            state.save()
+        summary.elapsed = time.perf_counter() - started
+        logger.info("SRT conversion: %s", summary)
+        return summary
+
+
+def convert_file(source, destination):
+    """Convert one SRT file, returning an error message instead of raising."""
+    try:
+        convert_srt_to_vtt(source, destination)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
 
 
 if __name__ == "__main__":
-    SRTConverter("data/srt_transcripts").convert_files_to_vtt()
+    logging.basicConfig(level=logging.INFO)
+    print(SRTConverter("data/srt_transcripts").convert_files_to_vtt())
@@ -0,0 +1,82 @@
+import re
+from metadata.files import atomic_write
+
+CUE_TIMINGS = re.compile(
+    r"\s*(\d+):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2}),(\d{3})"
+)
+
+
+class MalformedSRTError(ValueError):
+    pass
+
+
+class Cue:
+    """One SRT cue with WebVTT style HH:MM:SS.mmm timestamps."""
+
+    __slots__ = ("start", "end", "lines")
+
+    def __init__(self, start, end, lines):
+        self.start = start
+        self.end = end
+        self.lines = lines
+
+
+def _format_timestamp(hours, minutes, seconds, milliseconds):
+    return f"{int(hours):02d}:{minutes}:{seconds}.{milliseconds}"
+
+
+def iter_blocks(lines):
+    """Group lines into blocks separated by blank lines, one block at a time."""
+    block = []
+    for line in lines:
+        line = line.rstrip("\n\r")
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def iter_srt_cues(lines):
+    """Stream cues from the lines of an SRT file without reading the whole file.
+
+    Raises MalformedSRTError when the file is empty or doesn't open with a cue, and skips
+    any later block that isn't one, the same way webvtt.from_srt does.
+    """
+    position = -1
+    for position, block in enumerate(iter_blocks(lines)):
+        timings = CUE_TIMINGS.match(block[1]) if len(block) >= 3 else None
+        if timings is None or not block[0].isdigit():
+            if position == 0:
+                raise MalformedSRTError("Invalid format")
+            continue
+        yield Cue(
+            _format_timestamp(*timings.groups()[:4]),
+            _format_timestamp(*timings.groups()[4:]),
+            block[2:],
+        )
+    if position == -1:
+        raise MalformedSRTError("Invalid format")
+
+
+def write_vtt(cues, vtt):
+    """Write the WEBVTT header and each cue to an open text file as it arrives."""
+    vtt.write("WEBVTT\n")
+    for cue in cues:
+        vtt.write(f"\n{cue.start} --> {cue.end}\n")
+        for line in cue.lines:
+            vtt.write(f"{line}\n")
+
+
+def convert_srt_to_vtt(source, destination):
+    """Convert one SRT file to WebVTT in constant memory.
+
+    Output goes to a temporary file that replaces destination only once conversion
+    succeeds, so a malformed SRT never leaves a partial VTT behind.
+    """
+    with atomic_write(destination) as temporary, open(
+        source, "r", encoding="utf-8-sig"
+    ) as srt, open(temporary, "w", encoding="utf-8") as vtt:
+        write_vtt(iter_srt_cues(srt), vtt)
@@ -0,0 +1,59 @@
+from hashlib import sha256
+import json
+import os
+from metadata.files import atomic_write
+
+STATE_FILE = ".srt_state.json"
+
+
+class ConversionState:
+    """Source mtime, size and content hash for every SRT already converted to WebVTT.
+
+    The state lives in a small JSON file next to the VTT output. A source is current when
+    its VTT still exists and either its mtime and size are unchanged or, failing that, its
+    content hash is.
+    """
+
+    def __init__(self, vtt_path):
+        self.filename = os.path.join(vtt_path, STATE_FILE)
+        self.entries = self.__load(self.filename)
+
+    @staticmethod
+    def __load(filename):
+        try:
+            with open(filename, "r") as state:
+                return json.load(state)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def __hash(source):
+        digest = sha256()
+        with open(source, "rb") as srt:
+            for block in iter(lambda: srt.read(1 << 16), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_current(self, source, destination):
+        entry = self.entries.get(source)
+        if entry is None or not os.path.exists(destination):
+            return False
+        stat = os.stat(source)
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return True
+        if entry["size"] != stat.st_size or entry["sha256"] != self.__hash(source):
+            return False
+        entry["mtime"] = stat.st_mtime_ns
+        return True
+
+    def record(self, source):
+        stat = os.stat(source)
+        self.entries[source] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": self.__hash(source),
+        }
+
+    def save(self):
+        with atomic_write(self.filename) as temporary, open(temporary, "w") as state:
+            json.dump(self.entries, state, indent=2, sort_keys=True)
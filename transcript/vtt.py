@@ -0,0 +1,32 @@
+import re
+from .srt import Cue, iter_blocks
+
+VTT_CUE_TIMINGS = re.compile(
+    r"\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})\s*-->\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})"
+)
+NON_CUE_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+
+class MalformedVTTError(ValueError):
+    pass
+
+
+def iter_vtt_cues(lines):
+    """Stream cues from the lines of a WebVTT file without reading the whole file.
+
+    Raises MalformedVTTError when the file doesn't open with a WEBVTT header. Comments,
+    style and region blocks are skipped, as is any block without cue timings. Cue
+    identifiers are dropped; settings after the end timestamp are ignored.
+    """
+    blocks = iter_blocks(lines)
+    header = next(blocks, None)
+    if header is None or not header[0].lstrip("\ufeff").startswith("WEBVTT"):
+        raise MalformedVTTError("Missing WEBVTT header")
+    for block in blocks:
+        if block[0].startswith(NON_CUE_BLOCKS):
+            continue
+        for position, line in enumerate(block[:2]):
+            timings = VTT_CUE_TIMINGS.match(line)
+            if timings is not None:
+                yield Cue(timings[1], timings[2], block[position + 1 :])
+                break